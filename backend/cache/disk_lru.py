@@ -0,0 +1,107 @@
+"""
+AquaSentinel — Bounded On-Disk Cache
+Person 1 owns this file.
+Byte blobs stored as files under one directory, keyed by relative path, evicting the
+least recently used files once their total size passes max_bytes. Used for map tiles
+(routes/tiles.py).
+
+The directory belongs to one process and starts empty: entries derive from that
+process's in-memory store, so files from another run would be stale.
+Writes go to a temp file and os.replace(), so readers never see a partial file.
+"""
+
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+
+class DiskLRU:
+    def __init__(self, root: str, max_bytes: int):
+        self.root, self.max_bytes = root, max_bytes
+        self._index = OrderedDict()   # key → size in bytes, least recently used first
+        self._bytes = 0
+        self._lock  = threading.Lock()
+        self.stats  = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "invalidations": 0}
+        shutil.rmtree(root, ignore_errors=True)
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._index)
+
+    def get(self, key: str):
+        with self._lock:
+            if key not in self._index:
+                self.stats["misses"] += 1
+                return None
+            self._index.move_to_end(key)
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:    # deleted after the index check
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        evict = []
+        with self._lock:
+            self._bytes += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self.stats["writes"] += 1
+            while self._bytes > self.max_bytes and len(self._index) > 1:
+                old, size = self._index.popitem(last=False)
+                self._bytes -= size
+                self.stats["evictions"] += 1
+                evict.append(old)
+        for old in evict:
+            self._unlink(old)
+
+    def delete(self, keys) -> int:
+        """Drops the given keys (those not cached are ignored); returns how many were cached."""
+        dropped = []
+        with self._lock:
+            for key in keys:
+                size = self._index.pop(key, None)
+                if size is not None:
+                    self._bytes -= size
+                    dropped.append(key)
+            self.stats["invalidations"] += len(dropped)
+        for key in dropped:
+            self._unlink(key)
+        return len(dropped)
+
+    def _unlink(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        with self._lock:
+            self._index.clear()
+            self._bytes = 0
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def status(self) -> dict:
+        return {
+            "dir":       self.root,
+            "entries":   len(self._index),
+            "bytes":     self._bytes,
+            "max_bytes": self.max_bytes,
+            **self.stats,
+        }
@@ -0,0 +1,60 @@
+"""
+AquaSentinel — Data-Tagged ETags and Cache Keys
+Person 1 owns this file.
+
+The groundwater store carries a data tag: a hash of its content, chained with
+every change. Read endpoints whose output depends only on that data get a strong
+ETag derived from it, and a matching If-None-Match short-circuits to 304 in a
+dependency, before the handler runs. Cache keys embed the same tag, so a change
+invalidates every derived entry at once instead of waiting for TTLs.
+
+The tag is not the store's version counter: each uvicorn worker keeps its own store
+and counter, while Redis and clients see all of them. Two workers share a tag only
+when they hold the same data, so one never serves the other's entries or ETags.
+
+Usage:
+  @router.get("/all", dependencies=[Depends(conditional("gw-all"))])
+  await cached_json(vkey("gw:all"), ...)
+"""
+
+from fastapi import HTTPException, Request, Response
+from db.seed import data_tag
+from formats.columnar import wants_columnar
+
+
+def vkey(key: str, version: str = None) -> str:
+    """Cache key scoped to the current data tag (or an explicit one)."""
+    return f"{key}:{data_tag() if version is None else version}"
+
+
+def etag(resource: str) -> str:
+    return f'"{resource}-{data_tag()}"'
+
+
+def _matches(if_none_match: str, tag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison per RFC 9110 §13.1.2: W/ prefixes are ignored
+    return any(t.strip().removeprefix("W/") == tag for t in if_none_match.split(","))
+
+
+def conditional(resource, negotiated: bool = False):
+    """
+    Dependency: 304 on a matching If-None-Match, otherwise tag the response.
+    `resource` is a name, or a callable returning one when it varies beyond the data tag.
+    negotiated=True: the endpoint also serves the columnar format (formats/columnar.py),
+    whose representation gets its own tag and a Vary: Accept.
+    """
+    def check(request: Request, response: Response):
+        name = resource() if callable(resource) else resource
+        headers = {}
+        if negotiated:
+            headers["Vary"] = "Accept"
+            if wants_columnar(request):
+                name += "-columnar"
+        tag = etag(name)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, tag):
+            raise HTTPException(status_code=304, headers={"ETag": tag, **headers})
+        response.headers.update({"ETag": tag, **headers})
+    return check
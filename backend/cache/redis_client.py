@@ -1,48 +1,293 @@
+"""
+AquaSentinel — Two-Tier Cache
+Person 1 owns this file.
+
+L1: in-process TTL + bounded LRU dict (values kept as Python objects, no JSON)
+L2: Redis via redis.asyncio with a bounded, blocking connection pool (shared across workers)
+
+Redis is optional. Any L2 failure marks it down and retries with exponential
+backoff, so a hiccup degrades to L1-only instead of disabling Redis for good.
+
+cache_get_or_set adds per-key single-flight: when a hot key expires under load,
+one caller recomputes it and the rest wait for that result.
+Callers must treat returned values as read-only — L1 hands out the cached object itself.
+
+Entries cached with encoded=True are already-serialized JSON bytes (see cache/response.py):
+Redis stores the text as is and hits come back as bytes without being parsed.
+encoded="binary" is for other byte payloads (formats/columnar.py); Redis holds them base64-encoded.
+"""
+
 import os
 import json
+import base64
+import time
+import asyncio
+import inspect
+import threading
+from collections import OrderedDict
+from starlette.concurrency import run_in_threadpool
 
-REDIS_URL = os.getenv("REDIS_URL", "")
-REDIS_AVAILABLE = False
-_client = None
+REDIS_URL       = os.getenv("REDIS_URL", "")
+REDIS_POOL_SIZE = int(os.getenv("REDIS_POOL_SIZE", "20"))
+REDIS_TIMEOUT   = float(os.getenv("REDIS_TIMEOUT", "1"))   # connect/socket/pool-wait timeout, seconds
+RETRY_BASE_S    = 0.5
+RETRY_MAX_S     = 30.0
+
+L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", "1024"))
+L1_MAX_TTL     = float(os.getenv("CACHE_L1_TTL", "30"))   # caps L1 staleness while Redis is shared
+
+_MISS = object()
+
+_stats = {
+    "l1":           {"hits": 0, "misses": 0, "evictions": 0},
+    "l2":           {"hits": 0, "misses": 0, "errors": 0},
+    "single_flight": {"computes": 0, "waits_served": 0},
+}
+
+
+class _LocalCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data = OrderedDict()   # key → (expires_at, value), oldest first
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISS
+            if item[0] <= time.monotonic():
+                del self._data[key]
+                return _MISS
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, value, ttl: float):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                _stats["l1"]["evictions"] += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _RedisLink:
+    """Lazily-connected asyncio Redis client with reconnect backoff."""
+
+    def __init__(self, url: str):
+        self.url      = url
+        self.client   = None
+        self.up       = False
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def usable(self) -> bool:
+        return bool(self.url) and (self.up or time.monotonic() >= self.retry_at)
+
+    def get_client(self):
+        if self.client is None:
+            import redis.asyncio as aioredis
+            pool = aioredis.BlockingConnectionPool.from_url(
+                self.url,
+                max_connections=REDIS_POOL_SIZE,
+                timeout=REDIS_TIMEOUT,
+                socket_connect_timeout=REDIS_TIMEOUT,
+                socket_timeout=REDIS_TIMEOUT,
+                decode_responses=True,
+            )
+            self.client = aioredis.Redis(connection_pool=pool)
+        return self.client
+
+    def succeeded(self):
+        self.up       = True
+        self.failures = 0
+
+    def failed(self):
+        self.up        = False
+        self.failures += 1
+        self.retry_at  = time.monotonic() + min(RETRY_BASE_S * 2 ** (self.failures - 1), RETRY_MAX_S)
+        _stats["l2"]["errors"] += 1
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+            await self.client.connection_pool.disconnect()
+            self.client = None
+
+
+_l1    = _LocalCache(L1_MAX_ENTRIES)
+_redis = _RedisLink(REDIS_URL)
+_flights = {}                      # key → asyncio.Lock held by the caller recomputing it
 
-if REDIS_URL:
-    try:
-        import redis
-        _client = redis.from_url(REDIS_URL, decode_responses=True, socket_connect_timeout=1)
-        _client.ping()
-        REDIS_AVAILABLE = True
-    except Exception:
-        _client = None
-        REDIS_AVAILABLE = False
 
+def _dump(value, encoded) -> str:
+    if encoded == "binary":
+        return base64.b64encode(value).decode()
+    return value.decode() if encoded else json.dumps(value)
 
-def cache_get(key: str):
-    if not REDIS_AVAILABLE or _client is None:
+
+def _load(raw: str, encoded):
+    if encoded == "binary":
+        return base64.b64decode(raw)
+    return raw.encode() if encoded else json.loads(raw)
+
+
+def _l1_ttl(ttl: float) -> float:
+    return min(ttl, L1_MAX_TTL) if REDIS_URL else ttl
+
+
+async def _get(key: str, record: bool = True, encoded: bool = False):
+    val = _l1.get(key)
+    if val is not _MISS:
+        if record:
+            _stats["l1"]["hits"] += 1
+        return val
+    if record:
+        _stats["l1"]["misses"] += 1
+    if not _redis.usable():
         return None
     try:
-        val = _client.get(key)
-        return json.loads(val) if val else None
+        raw = await _redis.get_client().get(key)
     except Exception:
+        _redis.failed()
+        return None
+    _redis.succeeded()
+    if not raw:
+        if record:
+            _stats["l2"]["misses"] += 1
         return None
+    if record:
+        _stats["l2"]["hits"] += 1
+    val = _load(raw, encoded)
+    _l1.set(key, val, L1_MAX_TTL)
+    return val
+
+
+async def cache_get(key: str):
+    return await _get(key)
+
+
+async def cache_set(key: str, value, ttl: int = 300, encoded: bool = False):
+    _l1.set(key, value, _l1_ttl(ttl))
+    if not _redis.usable():
+        return
+    try:
+        await _redis.get_client().setex(key, ttl, _dump(value, encoded))
+    except Exception:
+        _redis.failed()
+        return
+    _redis.succeeded()
 
 
-def cache_set(key: str, value, ttl: int = 300):
-    if not REDIS_AVAILABLE or _client is None:
+async def cache_delete(key: str):
+    _l1.delete(key)
+    if not _redis.usable():
         return
     try:
-        _client.setex(key, ttl, json.dumps(value))
+        await _redis.get_client().delete(key)
     except Exception:
-        pass
+        _redis.failed()
+        return
+    _redis.succeeded()
 
 
-def cache_delete(key: str):
-    if not REDIS_AVAILABLE or _client is None:
+async def cache_mget(keys: list) -> list:
+    """Values for `keys` in order (None for misses): L1 first, one Redis MGET for the rest."""
+    values  = [_l1.get(k) for k in keys]
+    missing = [i for i, v in enumerate(values) if v is _MISS]
+    _stats["l1"]["hits"]   += len(keys) - len(missing)
+    _stats["l1"]["misses"] += len(missing)
+    for i in missing:
+        values[i] = None
+    if not missing or not _redis.usable():
+        return values
+    try:
+        raws = await _redis.get_client().mget([keys[i] for i in missing])
+    except Exception:
+        _redis.failed()
+        return values
+    _redis.succeeded()
+    for i, raw in zip(missing, raws):
+        if raw:
+            _stats["l2"]["hits"] += 1
+            values[i] = json.loads(raw)
+            _l1.set(keys[i], values[i], L1_MAX_TTL)
+        else:
+            _stats["l2"]["misses"] += 1
+    return values
+
+
+async def cache_mset(mapping: dict, ttl: int = 300):
+    """Sets every key in `mapping` with one pipelined round trip of SETEX commands."""
+    for key, value in mapping.items():
+        _l1.set(key, value, _l1_ttl(ttl))
+    if not mapping or not _redis.usable():
         return
     try:
-        _client.delete(key)
+        async with _redis.get_client().pipeline(transaction=False) as pipe:
+            for key, value in mapping.items():
+                pipe.setex(key, ttl, json.dumps(value))
+            await pipe.execute()
     except Exception:
-        pass
+        _redis.failed()
+        return
+    _redis.succeeded()
+
+
+async def cache_get_or_set(key: str, compute, ttl: int = 300, encoded: bool = False, store_key=None):
+    """
+    Returns the cached value for `key`, or computes it and caches it.
+    `compute` may be a coroutine function or a plain function (run in the threadpool).
+    Concurrent misses on the same key run `compute` once; the others wait and reuse it.
+    encoded=True / "binary": `compute` returns JSON / other bytes, cached and returned unparsed.
+    store_key(value) names the key to cache a computed value under when that depends on the
+    value itself (None: return it uncached); by default it is `key`.
+    """
+    val = await _get(key, encoded=encoded)
+    if val is not None:
+        return val
+
+    lock = _flights.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            # Whoever held the lock before us may have filled the cache already
+            val = await _get(key, record=False, encoded=encoded)
+            if val is not None:
+                _stats["single_flight"]["waits_served"] += 1
+                return val
+            _stats["single_flight"]["computes"] += 1
+            if inspect.iscoroutinefunction(compute):
+                val = await compute()
+            else:
+                val = await run_in_threadpool(compute)
+            target = key if store_key is None else store_key(val)
+            if target is not None:
+                await cache_set(target, val, ttl, encoded=encoded)
+            return val
+    finally:
+        # Also when compute() raises, so a failing key doesn't keep its lock forever
+        if _flights.get(key) is lock and not lock.locked():
+            del _flights[key]
+
+
+async def cache_close():
+    await _redis.close()
 
 
 def cache_status() -> dict:
-    return {"redis_available": REDIS_AVAILABLE, "url": REDIS_URL}
+    return {
+        "redis_available": _redis.up,
+        "url":             REDIS_URL,
+        "redis_pool_size": REDIS_POOL_SIZE,
+        "redis_retry_in_s": round(max(_redis.retry_at - time.monotonic(), 0), 2) if not _redis.up else 0,
+        "l1": {**_stats["l1"], "size": len(_l1), "max_entries": L1_MAX_ENTRIES, "max_ttl_s": L1_MAX_TTL},
+        "l2": dict(_stats["l2"]),
+        "single_flight": dict(_stats["single_flight"]),
+    }
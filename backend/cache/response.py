@@ -0,0 +1,62 @@
+"""
+AquaSentinel — Pre-Serialized JSON Responses
+Person 1 owns this file.
+
+Hot read endpoints cache the final response body rather than Python objects, so a cache
+hit goes straight out as bytes: no json.loads, no jsonable_encoder, no re-encoding.
+Misses are encoded once with orjson (stdlib json when orjson isn't installed).
+
+Usage:
+  @router.get("/all", dependencies=[Depends(conditional("gw-all"))])
+  async def get_all(response: Response):
+      return await cached_json(vkey("gw:all"), _all_readings, ttl=300, response=response)
+
+Passing the injected `response` carries headers set by dependencies (the ETag) over to
+the raw Response, which FastAPI would otherwise drop.
+"""
+
+import json
+import inspect
+import numpy as np
+from fastapi import Response
+from cache.redis_client import cache_get_or_set
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> bytes:
+    """Compact JSON bytes; NaN becomes null with orjson."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+
+def json_response(body: bytes, response: Response = None) -> Response:
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"} if response else None
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def cached_json(key: str, compute, ttl: int = 300, response: Response = None) -> Response:
+    """
+    cache_get_or_set for whole response bodies: `compute` (sync, run in the threadpool,
+    or a coroutine function) builds the value, which is encoded once and cached as bytes.
+    """
+    if inspect.iscoroutinefunction(compute):
+        async def encode():
+            return dumps(await compute())
+    else:
+        def encode():
+            return dumps(compute())
+    body = await cache_get_or_set(key, encode, ttl=ttl, encoded=True)
+    return json_response(body, response)
@@ -0,0 +1,175 @@
+"""
+AquaSentinel — Bulk Reading Ingestion
+Person 1 owns this file.
+Parses, validates and applies batches of field sensor / lab readings.
+
+A batch is a list of text lines (NDJSON objects or CSV rows). It is turned into
+columns once, validated with array masks rather than one Pydantic object per row,
+and written to the store in bulk. Each batch is planned and scored (db/risk.py) first,
+then applied under the store's write lock: the touched rows are written with their new
+risk, only those rows are refreshed in the materialized views, and the data version is
+bumped and the data tag re-hashed from those rows (which invalidates every versioned
+cache key and ETag).
+
+Fields (API names):
+  id                  — required; existing row key (state name / well id) or a new well id
+  state, district     — required for new ids (district optional)
+  latitude, longitude — required for new ids
+  depth_m             — required for new ids
+  depletion_per_year, fluoride_mgl, arsenic_mgl, iron_mgl — optional
+"""
+
+import csv
+import json
+import numpy as np
+from db.store import GroundwaterStore
+from db.views import MaterializedViews
+from db.risk import SCORED_COLUMNS
+
+# API field → store column, with the accepted (min, max) range
+NUMERIC_INPUTS = {
+    "depth_m":            ("depth",    0.0,    500.0),
+    "depletion_per_year": ("dep",      -50.0,  50.0),
+    "fluoride_mgl":       ("fluoride", 0.0,    50.0),
+    "arsenic_mgl":        ("arsenic",  0.0,    10.0),
+    "iron_mgl":           ("iron",     0.0,    100.0),
+    "latitude":           ("lat",      -90.0,  90.0),
+    "longitude":          ("lng",      -180.0, 180.0),
+}
+TEXT_INPUTS  = ("id", "state", "district")
+MEASUREMENTS = ("depth_m", "depletion_per_year", "fluoride_mgl", "arsenic_mgl", "iron_mgl")
+MAX_ERRORS   = 50   # per request, reported back to the caller
+
+
+def _to_float(values: list):
+    """Strings/numbers/None → float array (missing = NaN) plus a mask of unparseable cells."""
+    try:
+        arr = np.array(["nan" if v is None or v == "" else v for v in values], dtype=np.float64)
+        return arr, np.zeros(len(arr), dtype=bool)
+    except (TypeError, ValueError):
+        pass
+    arr = np.full(len(values), np.nan)
+    bad = np.zeros(len(values), dtype=bool)
+    for i, v in enumerate(values):
+        if v is None or v == "":
+            continue
+        try:
+            arr[i] = float(v)
+        except (TypeError, ValueError):
+            bad[i] = True
+    return arr, bad
+
+
+def _columns(records: list, get) -> dict:
+    cols = {f: np.array([str(get(r, f) or "").strip() for r in records], dtype=object) for f in TEXT_INPUTS}
+    cols["_unparseable"] = np.zeros(len(records), dtype=bool)
+    for f in NUMERIC_INPUTS:
+        cols[f], bad = _to_float([get(r, f) for r in records])
+        cols["_unparseable"] |= bad
+    return cols
+
+
+def parse_ndjson(lines: list):
+    """(columns, malformed line offsets) for a batch of NDJSON lines."""
+    records, malformed = [], []
+    for n, line in enumerate(lines):
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            malformed.append(n)
+            continue
+        if isinstance(obj, dict):
+            records.append(obj)
+        else:
+            malformed.append(n)
+    return _columns(records, dict.get), malformed
+
+
+def parse_csv(lines: list, header: list):
+    """(columns, malformed line offsets) for a batch of CSV lines under `header`."""
+    rows, malformed = [], []
+    for n, row in enumerate(csv.reader(lines)):
+        if len(row) == len(header):
+            rows.append(row)
+        else:
+            malformed.append(n)
+    pos = {f: header.index(f) for f in (*TEXT_INPUTS, *NUMERIC_INPUTS) if f in header}
+    return _columns(rows, lambda r, f: r[pos[f]] if f in pos else None), malformed
+
+
+def validate(cols: dict, store: GroundwaterStore):
+    """
+    Returns (ok mask, existing row index per record or -1, [(record offset, reason)]).
+    Every check is one array expression over the whole batch.
+    """
+    n    = len(cols["id"])
+    rows = np.fromiter((store.by_key.get(k, -1) for k in cols["id"]), dtype=np.intp, count=n)
+    new  = rows < 0
+    checks = [
+        (cols["id"] == "",          "missing id"),
+        (cols["_unparseable"],      "non-numeric value"),
+        (np.all([np.isnan(cols[f]) for f in MEASUREMENTS], axis=0), "no measurement given"),
+        (new & ((cols["state"] == "") | np.isnan(cols["latitude"]) | np.isnan(cols["longitude"]) | np.isnan(cols["depth_m"])),
+         "new id needs state, latitude, longitude and depth_m"),
+    ]
+    for f, (_, lo, hi) in NUMERIC_INPUTS.items():
+        v = cols[f]
+        with np.errstate(invalid="ignore"):
+            checks.append(((v < lo) | (v > hi), f"{f} outside [{lo}, {hi}]"))
+
+    ok, errors = np.ones(n, dtype=bool), []
+    for bad, reason in checks:
+        bad = bad & ok
+        ok &= ~bad
+        errors.extend((int(i), reason) for i in np.flatnonzero(bad)[:MAX_ERRORS])
+    errors.sort()
+    return ok, rows, errors
+
+
+def plan(cols: dict, ok: np.ndarray, rows: np.ndarray, store: GroundwaterStore) -> dict:
+    """
+    Which valid records update which rows and which become new rows, plus the scored
+    columns every touched row will hold once applied (existing rows first, then new ones),
+    so the batch can be scored before apply() takes the write lock.
+    """
+    idx = np.flatnonzero(ok)
+    # Last reading wins when a batch repeats an id
+    ids = cols["id"][idx]
+    _, last = np.unique(ids[::-1], return_index=True)
+    idx = np.sort(idx[len(ids) - 1 - last])
+
+    existing = idx[rows[idx] >= 0]
+    fresh    = idx[rows[idx] < 0]
+    values   = {}
+    for f, (col, _, _) in NUMERIC_INPUTS.items():
+        if col not in SCORED_COLUMNS:
+            continue
+        given = cols[f][existing]
+        current = np.where(np.isnan(given), store[col][rows[existing]], given)
+        values[col] = np.concatenate([current, np.nan_to_num(cols[f][fresh], nan=0.0)])
+    return {"existing": existing, "fresh": fresh, "rows": rows[existing], "values": values}
+
+
+def apply(cols: dict, planned: dict, codes: np.ndarray, scores: np.ndarray,
+          store: GroundwaterStore, views: MaterializedViews) -> dict:
+    """
+    Writes a planned batch with its precomputed risk (aligned with planned["values"]),
+    refreshes the touched rows and bumps the version. The caller holds the write lock,
+    and nothing else may have written the store since plan().
+    """
+    existing, fresh = planned["existing"], planned["fresh"]
+    touched = [planned["rows"]]
+
+    if len(existing):
+        store.update(planned["rows"], {col: cols[f][existing] for f, (col, _, _) in NUMERIC_INPUTS.items()})
+    if len(fresh):
+        numeric = {col: np.nan_to_num(cols[f][fresh], nan=0.0) for f, (col, _, _) in NUMERIC_INPUTS.items()}
+        numeric["score"] = np.zeros(len(fresh))
+        touched.append(store.append(cols["id"][fresh], cols["state"][fresh], cols["district"][fresh], numeric))
+
+    touched = np.concatenate(touched)
+    if len(touched):
+        store.set_risk(touched, codes, scores)
+        store.touch(touched)
+        views.refresh(touched)
+    return {"updated": int(len(existing)), "created": int(len(fresh))}
@@ -0,0 +1,64 @@
+"""
+AquaSentinel — Risk Scoring for Store Rows
+Person 1 owns this file.
+Re-scores rows after their readings change (see db/ingest.py and routes/ingest.py).
+
+Uses Person 2's XGBoost model in one batched call on the inference pool when it is
+available, otherwise the same weighted rule that labels the model's training data
+(ml/data/generate_mock.py), so fallback labels stay consistent with the model.
+Scoring works on the values rows will have, not on the store, so it runs before
+ingestion takes the store's write lock.
+"""
+
+import os
+import sys
+import numpy as np
+from db.store import RISK_CODES
+
+try:
+    sys.path.append(os.path.join(os.path.dirname(__file__), "../../ml"))
+    from predictors import xgboost_predict
+    ML_AVAILABLE = True
+except Exception:
+    ML_AVAILABLE = False
+
+# Rule thresholds: raw > 16 moderate, > 32 high, > 55 critical
+_RULE_EDGES = np.array([16.0, 32.0, 55.0])
+
+# Store columns a score depends on
+SCORED_COLUMNS = ("depth", "dep", "fluoride", "arsenic", "iron")
+
+
+def model_ready() -> bool:
+    return ML_AVAILABLE and xgboost_predict.model_available()
+
+
+def rule_scores(values: dict):
+    """(risk codes, 0–100 scores) from {store column: array} by the labelling rule."""
+    raw = (values["depth"] * 0.30 +
+           values["dep"] * 5 +
+           values["fluoride"] * 8 +
+           values["arsenic"] * 60)
+    codes = np.searchsorted(_RULE_EDGES, raw, side="left").astype(np.int8)
+    return codes, np.clip(raw, 0, 100).round(1)
+
+
+def features(values: dict) -> np.ndarray:
+    """The XGBoost feature matrix for {store column: array}; the model's inference job takes it as is."""
+    n = len(values["depth"])
+    return np.column_stack([
+        values["depth"],
+        values["dep"],
+        np.full(n, xgboost_predict.DEFAULTS["geology_score"]),
+        np.full(n, xgboost_predict.DEFAULTS["rainfall_mm"]),
+        values["fluoride"],
+        values["arsenic"],
+        values["iron"],
+    ])
+
+
+def from_results(results: list):
+    """(risk codes, scores) from the model's [{"risk_score", "risk_label"}, ...]."""
+    codes  = np.array([RISK_CODES[r["risk_label"]] for r in results], dtype=np.int8)
+    scores = np.array([r["risk_score"] for r in results], dtype=float)
+    return codes, scores
@@ -3,8 +3,14 @@ AquaSentinel — Mock Data Store
 Person 1 owns this file.
 Single source of truth for all state groundwater data.
 Used by all route handlers as the data source (replaces DB for hackathon demo).
+
+STATES is the seed literal only; at runtime rows live in the columnar
+GroundwaterStore (db/store.py) and the accessors below read from it.
 """
 
+from db.store import GroundwaterStore, RISK_CODES
+from db.views import MaterializedViews
+
 # Safe limits (BIS / WHO standards)
 SAFE_LIMITS = {
     "fluoride": 1.5,   # mg/L
@@ -42,16 +48,50 @@ STATES = {
 }
 
 
+STORE = GroundwaterStore.from_records(STATES)
+VIEWS = MaterializedViews(STORE, SAFE_LIMITS)
+
+
+def get_store() -> GroundwaterStore:
+    return STORE
+
+
+def get_views() -> MaterializedViews:
+    return VIEWS
+
+
+def data_version() -> int:
+    return STORE.version
+
+
+def data_tag() -> str:
+    """Content hash of the store, the same in every worker holding the same data."""
+    return STORE.tag
+
+
 def get_all_states():
-    return STATES
+    """Every row, wells and districts included; see get_state_level() for one row per state."""
+    with STORE.lock.read():
+        return STORE.records()
+
+
+def get_state_level():
+    """Records of the state-level rows only (key == state), without districts and wells."""
+    with STORE.lock.read():
+        return STORE.records(STORE.state_rows)
 
 
 def get_state(name: str):
-    return STATES.get(name)
+    with STORE.lock.read():
+        i = STORE.row(name)
+        return STORE.record(i) if i is not None else None
 
 
 def get_states_by_risk(level: str):
-    return {k: v for k, v in STATES.items() if v["risk"] == level}
+    if level not in RISK_CODES:
+        return {}
+    with STORE.lock.read():
+        return STORE.records(STORE.by_risk[level])
 
 
 def contam_exceeds(state_data: dict, chemical: str) -> bool:
@@ -59,19 +99,22 @@ def contam_exceeds(state_data: dict, chemical: str) -> bool:
 
 
 def national_stats():
-    total = len(STATES)
-    return {
-        "total_states": total,
-        "critical": sum(1 for d in STATES.values() if d["risk"] == "critical"),
-        "high":     sum(1 for d in STATES.values() if d["risk"] == "high"),
-        "moderate": sum(1 for d in STATES.values() if d["risk"] == "moderate"),
-        "low":      sum(1 for d in STATES.values() if d["risk"] == "low"),
-        "fluoride_exceed_pct": round(sum(1 for d in STATES.values() if d["fluoride"] > SAFE_LIMITS["fluoride"]) / total * 100, 1),
-        "arsenic_exceed_pct":  round(sum(1 for d in STATES.values() if d["arsenic"]  > SAFE_LIMITS["arsenic"])  / total * 100, 1),
-        "iron_exceed_pct":     round(sum(1 for d in STATES.values() if d["iron"]     > SAFE_LIMITS["iron"])     / total * 100, 1),
-        "cities_at_risk": 21,
-        "farmers_covered_million": 700,
-        "panchayats": 6500,
-        "groundwater_lost_km3": 450,
-        "india_global_usage_pct": 25,
-    }
+    # Every figure covers the same population: state-level rows, not ingested districts or wells
+    with STORE.lock.read():
+        rows   = STORE.state_rows
+        counts = STORE.risk_counts(rows)
+        return {
+            "total_states": len(rows),
+            "critical": counts["critical"],
+            "high":     counts["high"],
+            "moderate": counts["moderate"],
+            "low":      counts["low"],
+            "fluoride_exceed_pct": STORE.exceed_pct("fluoride", SAFE_LIMITS["fluoride"], rows),
+            "arsenic_exceed_pct":  STORE.exceed_pct("arsenic", SAFE_LIMITS["arsenic"], rows),
+            "iron_exceed_pct":     STORE.exceed_pct("iron", SAFE_LIMITS["iron"], rows),
+            "cities_at_risk": 21,
+            "farmers_covered_million": 700,
+            "panchayats": 6500,
+            "groundwater_lost_km3": 450,
+            "india_global_usage_pct": 25,
+        }
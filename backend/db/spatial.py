@@ -0,0 +1,108 @@
+"""
+AquaSentinel — Spatial Grid Index
+Person 1 owns this file.
+Uniform lat/lng grid over a GroundwaterStore for map viewport (bbox) and
+k-nearest queries. Rows are bucketed by cell id and sorted once, so a query
+only touches the cells it overlaps instead of scanning every row.
+"""
+
+import math
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT  = 111.195
+TARGET_PER_CELL = 8        # average rows per cell the grid size is tuned for
+
+
+def haversine_km(lat, lng, lats, lngs) -> np.ndarray:
+    """Great-circle distance (km) from one point to arrays of points."""
+    p1, p2 = np.radians(lat), np.radians(lats)
+    dphi   = p2 - p1
+    dlmb   = np.radians(lngs - lng)
+    a = np.sin(dphi / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GridIndex:
+    def __init__(self, lat: np.ndarray, lng: np.ndarray, target_per_cell: int = TARGET_PER_CELL):
+        self.lat = lat
+        self.lng = lng
+        self.n   = len(lat)
+        if self.n == 0:
+            self.lat0 = self.lng0 = 0.0
+            self.cell = 1.0
+            self.ny = self.nx = 1
+            self.order  = np.empty(0, dtype=np.intp)
+            self.starts = np.zeros(2, dtype=np.intp)
+            return
+
+        self.lat0, self.lng0 = float(lat.min()), float(lng.min())
+        lat_span = float(lat.max()) - self.lat0 + 1e-6
+        lng_span = float(lng.max()) - self.lng0 + 1e-6
+        # Cell edge (degrees) so that cells hold ~target_per_cell rows on average
+        self.cell = min(max(math.sqrt(lat_span * lng_span * target_per_cell / self.n), 0.01), 5.0)
+        self.ny = int(lat_span // self.cell) + 1
+        self.nx = int(lng_span // self.cell) + 1
+
+        cell_id     = self._cell_y(lat) * self.nx + self._cell_x(lng)
+        self.order  = np.argsort(cell_id, kind="stable")
+        self.starts = np.searchsorted(cell_id[self.order], np.arange(self.ny * self.nx + 1))
+        # Shortest longitude degree in the data, for a conservative kNN stopping bound
+        self._min_lng_km = KM_PER_DEG_LAT * math.cos(math.radians(float(np.abs(lat).max())))
+
+    def _cell_y(self, lat):
+        return np.clip(((lat - self.lat0) // self.cell).astype(np.intp), 0, self.ny - 1)
+
+    def _cell_x(self, lng):
+        return np.clip(((lng - self.lng0) // self.cell).astype(np.intp), 0, self.nx - 1)
+
+    def _rows_in_cells(self, y0: int, y1: int, x0: int, x1: int) -> np.ndarray:
+        # Cells x0..x1 of one grid row are contiguous in sorted order → one slice per grid row
+        ys     = np.arange(y0, y1 + 1) * self.nx
+        starts = self.starts[ys + x0]
+        ends   = self.starts[ys + x1 + 1]
+        return np.concatenate([self.order[s:e] for s, e in zip(starts.tolist(), ends.tolist())])
+
+    def bbox(self, min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> np.ndarray:
+        """Row indices inside the box (inclusive), in row order."""
+        if self.n == 0 or min_lat > max_lat or min_lng > max_lng:
+            return np.empty(0, dtype=np.intp)
+        y0, y1 = (int(v) for v in self._cell_y(np.array([min_lat, max_lat])))
+        x0, x1 = (int(v) for v in self._cell_x(np.array([min_lng, max_lng])))
+        rows = self._rows_in_cells(y0, y1, x0, x1)
+        lat, lng = self.lat[rows], self.lng[rows]
+        inside = (lat >= min_lat) & (lat <= max_lat) & (lng >= min_lng) & (lng <= max_lng)
+        return np.sort(rows[inside])
+
+    def _edge_km(self, lat: float, lng: float, y0: int, y1: int, x0: int, x1: int) -> float:
+        """Distance from the query to the nearest searched-box edge that has unsearched cells beyond it."""
+        edges = [math.inf]
+        if y0 > 0:
+            edges.append((lat - (self.lat0 + y0 * self.cell)) * KM_PER_DEG_LAT)
+        if y1 < self.ny - 1:
+            edges.append((self.lat0 + (y1 + 1) * self.cell - lat) * KM_PER_DEG_LAT)
+        if x0 > 0:
+            edges.append((lng - (self.lng0 + x0 * self.cell)) * self._min_lng_km)
+        if x1 < self.nx - 1:
+            edges.append((self.lng0 + (x1 + 1) * self.cell - lng) * self._min_lng_km)
+        return min(edges)
+
+    def nearest(self, lat: float, lng: float, k: int):
+        """(row indices, distances in km) of the k nearest rows, closest first."""
+        k = min(k, self.n)
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        cy = int(self._cell_y(np.array(lat)))
+        cx = int(self._cell_x(np.array(lng)))
+        r = 0
+        while True:
+            y0, y1 = max(cy - r, 0), min(cy + r, self.ny - 1)
+            x0, x1 = max(cx - r, 0), min(cx + r, self.nx - 1)
+            rows = self._rows_in_cells(y0, y1, x0, x1)
+            if len(rows) >= k:
+                dist = haversine_km(lat, lng, self.lat[rows], self.lng[rows])
+                top  = np.argpartition(dist, k - 1)[:k]
+                if dist[top].max() <= self._edge_km(lat, lng, y0, y1, x0, x1):
+                    top = top[np.argsort(dist[top], kind="stable")]
+                    return rows[top], dist[top]
+            r = max(1, r * 2)
@@ -0,0 +1,237 @@
+"""
+AquaSentinel — Columnar Groundwater Store
+Person 1 owns this file.
+Array-backed replacement for scanning the STATES dict.
+
+Every field is a NumPy column; a row is one reading entity (state, district or well).
+Secondary indexes by state, district, risk level and location (db/spatial.py)
+are built once per load, and aggregates such as national_stats are vectorized
+reductions over the columns.
+
+Ingestion mutates the store on a worker thread while handlers read it, so both go
+through store.lock: readers hold lock.read() while they look at rows, ingestion holds
+lock.write() for a whole validate + apply batch. Neither is reentrant.
+"""
+
+import hashlib
+import threading
+from contextlib import contextmanager
+import numpy as np
+from db.spatial import GridIndex
+
+RISK_LEVELS = ("low", "moderate", "high", "critical")   # code = position, same as XGBoost labels
+RISK_CODES  = {level: code for code, level in enumerate(RISK_LEVELS)}
+
+# Seed-record field name → column name for the numeric columns
+NUMERIC_FIELDS = ("depth", "dep", "score", "lat", "lng", "fluoride", "arsenic", "iron")
+
+
+def _group(values: np.ndarray) -> dict:
+    """value → sorted row indices, built with one argsort (no per-row Python loop)."""
+    if len(values) == 0:
+        return {}
+    uniq, inverse = np.unique(values, return_inverse=True)
+    order  = np.argsort(inverse, kind="stable")
+    splits = np.cumsum(np.bincount(inverse, minlength=len(uniq)))[:-1]
+    return dict(zip(uniq.tolist(), np.split(order, splits)))
+
+
+def _extend_groups(groups: dict, values: np.ndarray, offset: int, skip_empty: bool = False):
+    """Adds rows offset.. (grouped by `values`) to an existing _group result in place."""
+    for value, idx in _group(values).items():
+        if skip_empty and not value:
+            continue
+        old = groups.get(value)
+        groups[value] = idx + offset if old is None else np.concatenate([old, idx + offset])
+
+
+class RWLock:
+    """Many readers or one writer. A waiting writer holds off new readers, so ingestion isn't starved."""
+
+    def __init__(self):
+        self._cond    = threading.Condition()
+        self._readers = 0
+        self._writer  = False
+        self._waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class GroundwaterStore:
+    """
+    Columns:
+      key       — unique row id (state name for state-level rows)
+      state     — state the row belongs to
+      district  — district name, "" for state-level rows
+      risk      — int8 risk code (see RISK_LEVELS)
+      depth, dep, score, lat, lng, fluoride, arsenic, iron — float64
+    """
+
+    def __init__(self, keys, states, districts, risk, numeric: dict, version: int = 1):
+        self.version  = version   # bumped on every data change (this process's own count)
+        self.lock     = RWLock()
+        self.key      = np.asarray(keys,      dtype=object)
+        self.state    = np.asarray(states,    dtype=object)
+        self.district = np.asarray(districts, dtype=object)
+        self.risk     = np.asarray(risk,      dtype=np.int8)
+        self.columns  = {f: np.asarray(numeric[f], dtype=np.float64) for f in NUMERIC_FIELDS}
+        self._build_indexes()
+        self.tag      = self._digest(np.arange(len(self)))   # content hash; drives ETags and cache keys
+
+    @classmethod
+    def from_records(cls, records: dict) -> "GroundwaterStore":
+        """Builds a store from {key: seed-style dict}; "state"/"district" default to key/""."""
+        keys = list(records)
+        rows = list(records.values())
+        return cls(
+            keys      = keys,
+            states    = [r.get("state", k) for k, r in zip(keys, rows)],
+            districts = [r.get("district") or "" for r in rows],
+            risk      = [RISK_CODES[r["risk"]] for r in rows],
+            numeric   = {f: [r[f] for r in rows] for f in NUMERIC_FIELDS},
+        )
+
+    def _build_indexes(self):
+        self.by_key      = {k: i for i, k in enumerate(self.key.tolist())}
+        self.by_state    = _group(self.state.astype(str))
+        self.by_district = {d: idx for d, idx in _group(self.district.astype(str)).items() if d}
+        self.state_rows  = np.flatnonzero(self.key == self.state)   # state-level rows (key == state)
+        self.spatial     = GridIndex(self.columns["lat"], self.columns["lng"])
+        self._build_risk_index()
+
+    def _build_risk_index(self):
+        self.by_risk = {level: np.flatnonzero(self.risk == code) for level, code in RISK_CODES.items()}
+
+    # ── Bulk mutation (callers bump the version with touch() once per batch) ──
+
+    def update(self, rows: np.ndarray, values: dict) -> bool:
+        """
+        Writes {column: float array aligned with rows} in place; NaN leaves a cell unchanged.
+        Returns True if any location moved (the spatial index was rebuilt).
+        """
+        moved = False
+        for column, arr in values.items():
+            given = ~np.isnan(arr)
+            self.columns[column][rows[given]] = arr[given]
+            moved |= column in ("lat", "lng") and bool(given.any())
+        if moved:
+            self.spatial = GridIndex(self.columns["lat"], self.columns["lng"])
+        return moved
+
+    def append(self, keys, states, districts, numeric: dict) -> np.ndarray:
+        """
+        Adds rows (risk starts at "low" until scored) and returns their indices.
+        Key/state/district indexes are extended with just the new rows; the grid is rebuilt.
+        """
+        start     = len(self)
+        n         = len(keys)
+        keys      = np.asarray(keys,      dtype=object)
+        states    = np.asarray(states,    dtype=object)
+        districts = np.asarray(districts, dtype=object)
+        self.key      = np.concatenate([self.key,      keys])
+        self.state    = np.concatenate([self.state,    states])
+        self.district = np.concatenate([self.district, districts])
+        self.risk     = np.concatenate([self.risk,     np.zeros(n, dtype=np.int8)])
+        for f in NUMERIC_FIELDS:
+            self.columns[f] = np.concatenate([self.columns[f], np.asarray(numeric[f], dtype=np.float64)])
+
+        self.by_key.update(zip(keys.tolist(), range(start, start + n)))
+        _extend_groups(self.by_state,    states.astype(str),    start)
+        _extend_groups(self.by_district, districts.astype(str), start, skip_empty=True)
+        self.state_rows = np.concatenate([self.state_rows, start + np.flatnonzero(keys == states)])
+        self.spatial = GridIndex(self.columns["lat"], self.columns["lng"])
+        self._build_risk_index()
+        return np.arange(start, start + n)
+
+    def set_risk(self, rows: np.ndarray, codes: np.ndarray, scores: np.ndarray):
+        self.risk[rows]            = codes
+        self.columns["score"][rows] = scores
+        self._build_risk_index()
+
+    def __len__(self) -> int:
+        return len(self.key)
+
+    def touch(self, rows: np.ndarray = None) -> int:
+        """
+        Marks the data as changed and returns the new version. The tag is chained with the
+        content of the changed rows (all rows by default), so it names the data itself: stores
+        in different processes share a tag exactly when they hold the same data, whatever
+        their version counters say.
+        """
+        self.version += 1
+        self.tag = self._digest(np.arange(len(self)) if rows is None else rows, self.tag)
+        return self.version
+
+    def _digest(self, rows: np.ndarray, prev: str = "") -> str:
+        rows = np.asarray(rows, dtype=np.int64)
+        h = hashlib.blake2b(prev.encode(), digest_size=8)
+        h.update(rows.tobytes())
+        for labels in (self.key, self.state, self.district):
+            h.update("\0".join(map(str, labels[rows].tolist())).encode())
+        h.update(self.risk[rows].tobytes())
+        for f in NUMERIC_FIELDS:
+            h.update(self.columns[f][rows].tobytes())
+        return h.hexdigest()
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def row(self, key: str):
+        """Row index for `key`, or None."""
+        return self.by_key.get(key)
+
+    def record(self, i: int) -> dict:
+        """One row in the seed-dict shape ({"depth":..., "risk":..., ...})."""
+        rec = {f: float(self.columns[f][i]) for f in NUMERIC_FIELDS}
+        rec["risk"] = RISK_LEVELS[self.risk[i]]
+        return rec
+
+    def records(self, idx=None) -> dict:
+        """{key: record} for the given row indices (all rows by default), in row order."""
+        rows = range(len(self)) if idx is None else np.asarray(idx).tolist()
+        return {self.key[i]: self.record(i) for i in rows}
+
+    def risk_counts(self, idx=None) -> dict:
+        """Rows per risk level, over the given row indices (all rows by default)."""
+        risk   = self.risk if idx is None else self.risk[idx]
+        counts = np.bincount(risk, minlength=len(RISK_LEVELS))
+        return {level: int(counts[code]) for level, code in RISK_CODES.items()}
+
+    def exceeds(self, chemical: str, limit: float) -> np.ndarray:
+        """Boolean mask of rows above the safe limit for `chemical`."""
+        return self.columns[chemical] > limit
+
+    def exceed_pct(self, chemical: str, limit: float, idx=None) -> float:
+        mask = self.exceeds(chemical, limit)
+        if idx is not None:
+            mask = mask[idx]
+        if len(mask) == 0:
+            return 0.0
+        return round(float(mask.mean()) * 100, 1)
@@ -0,0 +1,145 @@
+"""
+AquaSentinel — Map Tiles
+Person 1 owns this file.
+Builds XYZ (Web Mercator) map tiles from the GroundwaterStore for /api/tiles.
+
+What a tile holds depends on its zoom:
+  z <  TILE_DISTRICT_ZOOM  — one aggregate per state with readings in the tile
+  z <  TILE_WELL_ZOOM      — one aggregate per district (state-level rows under their state)
+  otherwise                — every reading in the tile as a point
+
+Aggregates cover the whole region, not just the part inside the tile, so neighbouring tiles
+agree on the value a choropleth colours a region with. tiles_touched() answers which tiles
+a set of changed rows affects, so only those are rebuilt.
+"""
+
+import os
+import numpy as np
+from db.store import GroundwaterStore, RISK_LEVELS
+
+TILE_DISTRICT_ZOOM = int(os.getenv("TILE_DISTRICT_ZOOM", "5"))
+TILE_WELL_ZOOM     = int(os.getenv("TILE_WELL_ZOOM", "8"))
+MAX_ZOOM           = 18
+MAX_MERCATOR_LAT   = 85.05112878
+
+_regions_memo = {}   # level → (row count, regions); a row's state/district never changes
+_stats_memo   = {}   # level → (store version, row count, aggregates)
+
+
+def tile_level(z: int) -> str:
+    if z < TILE_DISTRICT_ZOOM:
+        return "state"
+    return "district" if z < TILE_WELL_ZOOM else "well"
+
+
+def tile_bounds(z: int, x: int, y: int):
+    """(min_lat, min_lng, max_lat, max_lng) of a tile."""
+    n = 2 ** z
+    lat = lambda t: float(np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * t / n)))))
+    return lat(y + 1), x / n * 360 - 180, lat(y), (x + 1) / n * 360 - 180
+
+
+def tile_xy(lat, lng, z: int):
+    """Tile column and row containing each point at zoom z."""
+    n   = 2 ** z
+    phi = np.radians(np.clip(lat, -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT))
+    x   = np.floor((np.asarray(lng) + 180) / 360 * n)
+    y   = np.floor((1 - np.arcsinh(np.tan(phi)) / np.pi) / 2 * n)
+    return np.clip(x, 0, n - 1).astype(np.int64), np.clip(y, 0, n - 1).astype(np.int64)
+
+
+def _regions(store: GroundwaterStore, level: str) -> dict:
+    """Region names, each row's region, and each region's first row; recomputed only when rows are added."""
+    memo = _regions_memo.get(level)
+    if memo and memo[0] == len(store):
+        return memo[1]
+    states    = store.state.astype(str)
+    districts = store.district.astype(str)
+    labels = states if level == "state" else np.where(districts != "", districts, states)
+    names, inverse = np.unique(labels, return_inverse=True)
+    first = np.full(len(names), len(store))      # first row of each region, for its state/district
+    np.minimum.at(first, inverse, np.arange(len(store)))
+    regions = {"names": names, "inverse": inverse, "state": states[first], "district": districts[first]}
+    _regions_memo[level] = (len(store), regions)
+    return regions
+
+
+def _group_stats(store: GroundwaterStore, level: str) -> dict:
+    """Per-region aggregates over every row, recomputed once per data version."""
+    memo = _stats_memo.get(level)
+    if memo and memo[0] == store.version and memo[1] == len(store):
+        return memo[2]
+    regions = _regions(store, level)
+    inverse, n = regions["inverse"], len(regions["names"])
+    count = np.bincount(inverse, minlength=n)
+    mean  = lambda col: np.bincount(inverse, weights=store[col], minlength=n) / np.maximum(count, 1)
+    max_risk = np.zeros(n, dtype=np.int8)
+    np.maximum.at(max_risk, inverse, store.risk)
+    stats = {
+        **regions, "count": count, "max_risk": max_risk,
+        "depth": mean("depth"), "score": mean("score"), "lat": mean("lat"), "lng": mean("lng"),
+    }
+    _stats_memo[level] = (store.version, len(store), stats)
+    return stats
+
+
+def _rows_in_tile(store: GroundwaterStore, z: int, x: int, y: int) -> np.ndarray:
+    rows = store.spatial.bbox(*tile_bounds(z, x, y))
+    # bbox is inclusive on every edge; keep only rows whose own tile this is
+    tx, ty = tile_xy(store["lat"][rows], store["lng"][rows], z)
+    return rows[(tx == x) & (ty == y)]
+
+
+def build_tile(store: GroundwaterStore, z: int, x: int, y: int) -> dict:
+    level = tile_level(z)
+    rows  = _rows_in_tile(store, z, x, y)
+    if level == "well":
+        features = [
+            {
+                "id":         store.key[i],
+                "state":      store.state[i],
+                "district":   store.district[i] or None,
+                "depth_m":    float(store["depth"][i]),
+                "risk_score": float(store["score"][i]),
+                "risk_level": RISK_LEVELS[store.risk[i]],
+                "latitude":   float(store["lat"][i]),
+                "longitude":  float(store["lng"][i]),
+            }
+            for i in rows.tolist()
+        ]
+    else:
+        s = _group_stats(store, level)
+        features = [
+            {
+                "name":            s["names"][g],
+                "state":           s["state"][g],
+                **({"district": s["district"][g] or None} if level == "district" else {}),
+                "readings":        int(s["count"][g]),
+                "mean_depth_m":    round(float(s["depth"][g]), 2),
+                "mean_risk_score": round(float(s["score"][g]), 1),
+                "max_risk_level":  RISK_LEVELS[s["max_risk"][g]],
+                "latitude":        round(float(s["lat"][g]), 5),
+                "longitude":       round(float(s["lng"][g]), 5),
+            }
+            for g in np.unique(s["inverse"][rows]).tolist()
+        ]
+    return {"z": z, "x": x, "y": y, "level": level, "features": features}
+
+
+def tiles_touched(store: GroundwaterStore, rows: np.ndarray, z: int, old_lat=None, old_lng=None) -> set:
+    """
+    (x, y) of every zoom-z tile whose content changes when `rows` change: tiles holding
+    the rows now and before (old_lat/old_lng, NaN for new rows) and, at aggregate zooms,
+    every tile holding any row of a region those rows belong to.
+    """
+    affected = rows
+    if tile_level(z) != "well":
+        inverse  = _regions(store, tile_level(z))["inverse"]
+        affected = np.flatnonzero(np.isin(inverse, inverse[rows]))
+    xs, ys = tile_xy(store["lat"][affected], store["lng"][affected], z)
+    touched = set(zip(xs.tolist(), ys.tolist()))
+    if old_lat is not None:
+        known = ~np.isnan(old_lat)
+        xs, ys = tile_xy(old_lat[known], old_lng[known], z)
+        touched.update(zip(xs.tolist(), ys.tolist()))
+    return touched
@@ -0,0 +1,128 @@
+"""
+AquaSentinel — Memory-Mapped Time-Series Store
+Person 1 owns this file.
+Monthly depth history for every state/well in one contiguous float32 file,
+plus an offset index, so reads are zero-copy slices of a memmap instead of
+CSV/pandas parsing.
+
+Files (next to the source CSV, rebuilt on first use whenever the CSV is newer):
+  depletion_series.f32      — all series back to back, float32
+  depletion_series.idx.npz  — keys, offsets, lengths, start_month per series
+
+Convert manually:
+  python -m db.timeseries ../ml/data/depletion_series.csv
+"""
+
+import csv
+import os
+import sys
+import threading
+import numpy as np
+
+DATA_DIR   = os.getenv("TIMESERIES_DIR", os.path.join(os.path.dirname(__file__), "../../ml/data"))
+CSV_PATH   = os.path.join(DATA_DIR, "depletion_series.csv")
+VALUES_EXT = ".f32"
+INDEX_EXT  = ".idx.npz"
+
+
+def _prefix(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0]
+
+
+def convert_csv(csv_path: str = CSV_PATH) -> str:
+    """
+    Converts a (state, month, depth_m) CSV into the binary layout.
+    Months missing inside a series are stored as NaN. Returns the file prefix.
+    """
+    series = {}
+    with open(csv_path, newline="") as f:
+        for row in csv.DictReader(f):
+            series.setdefault(row["state"], []).append((int(row["month"]), float(row["depth_m"])))
+
+    keys, offsets, lengths, starts, chunks = [], [], [], [], []
+    offset = 0
+    for key, points in series.items():
+        months = np.array([m for m, _ in points])
+        start  = int(months.min())
+        dense  = np.full(int(months.max()) - start + 1, np.nan, dtype=np.float32)
+        dense[months - start] = [v for _, v in points]
+        keys.append(key)
+        offsets.append(offset)
+        lengths.append(len(dense))
+        starts.append(start)
+        chunks.append(dense)
+        offset += len(dense)
+
+    prefix = _prefix(csv_path)
+    values = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.float32)
+    tmp = prefix + VALUES_EXT + ".tmp"
+    values.tofile(tmp)
+    os.replace(tmp, prefix + VALUES_EXT)
+    tmp = prefix + ".idx.tmp.npz"
+    np.savez(tmp, keys=np.array(keys, dtype=str), offsets=np.array(offsets, dtype=np.int64),
+             lengths=np.array(lengths, dtype=np.int64), starts=np.array(starts, dtype=np.int64))
+    os.replace(tmp, prefix + INDEX_EXT)
+    return prefix
+
+
+class SeriesStore:
+    """Read-only view over the binary files. All reads return memmap slices (no copy)."""
+
+    def __init__(self, prefix: str):
+        size = os.path.getsize(prefix + VALUES_EXT)
+        self.values = (np.memmap(prefix + VALUES_EXT, dtype=np.float32, mode="r")
+                       if size else np.empty(0, dtype=np.float32))
+        with np.load(prefix + INDEX_EXT) as idx:
+            self.index = {
+                key: (int(off), int(n), int(start))
+                for key, off, n, start in zip(idx["keys"].tolist(), idx["offsets"],
+                                              idx["lengths"], idx["starts"])
+            }
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def bounds(self, key: str):
+        """(first_month, last_month) for a series, inclusive."""
+        _, n, start = self.index[key]
+        return start, start + n - 1
+
+    def range(self, key: str, start: int = None, end: int = None) -> np.ndarray:
+        """Months start..end inclusive (clipped to the series) as a zero-copy view."""
+        off, n, first = self.index[key]
+        lo = 0 if start is None else min(max(start - first, 0), n)
+        hi = n if end   is None else min(max(end - first + 1, lo), n)
+        return self.values[off + lo: off + hi]
+
+    def last(self, key: str, months: int) -> np.ndarray:
+        off, n, _ = self.index[key]
+        return self.values[off + max(n - months, 0): off + n]
+
+
+_store = None
+_open_lock = threading.Lock()    # first use converts the CSV; concurrent callers wait for it
+
+
+def get_series_store(csv_path: str = CSV_PATH):
+    """Opens the binary store, converting the CSV on first use. None if no data exists."""
+    global _store
+    if _store is not None:
+        return _store
+    with _open_lock:
+        if _store is not None:
+            return _store
+        prefix = _prefix(csv_path)
+        have_csv = os.path.exists(csv_path)
+        if not os.path.exists(prefix + INDEX_EXT):
+            if not have_csv:
+                return None
+            convert_csv(csv_path)
+        elif have_csv and os.path.getmtime(csv_path) > os.path.getmtime(prefix + INDEX_EXT):
+            convert_csv(csv_path)   # CSV was regenerated since the last conversion
+        _store = SeriesStore(prefix)
+    return _store
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else CSV_PATH
+    print(f"Converted → {convert_csv(path)}{VALUES_EXT}")
@@ -0,0 +1,178 @@
+"""
+AquaSentinel — Materialized Views
+Person 1 owns this file.
+Alert, contamination and national-stats outputs kept ready-built next to the store.
+
+Built once at load; refresh(rows) re-derives only the given rows: their
+formatted alert entries are replaced and their old contributions to the
+running counts are swapped for the new ones. Sorted lists are re-assembled
+lazily from the ready entries on the next read.
+
+Listeners registered with subscribe() get the alert changes of each refresh
+as a list of {"change": raised|escalated|deescalated|updated|cleared, ...};
+listeners registered with watch() get the row indices of every refresh.
+
+refresh() runs on an ingest worker thread while handlers read the lists from the
+threadpool or the event loop: one lock covers updating the entries and assembling
+the lists from them, so a list is never built from a half-applied refresh, and one
+built before a refresh can't replace the reset that refresh made.
+"""
+
+import threading
+import numpy as np
+from db.store import GroundwaterStore, RISK_LEVELS, RISK_CODES
+
+CHEMICALS = ("fluoride", "arsenic", "iron")
+
+
+class MaterializedViews:
+    def __init__(self, store: GroundwaterStore, limits: dict):
+        self.store  = store
+        self.limits = limits
+        self._limit_vec    = np.array([limits[c] for c in CHEMICALS])
+        self._risk_snap    = np.full(0, -1, dtype=np.int8)          # risk code each row was counted under (-1 = not yet)
+        self._exceed_snap  = np.zeros((0, len(CHEMICALS)), dtype=bool)
+        self._risk_counts  = np.zeros(len(RISK_LEVELS), dtype=np.int64)
+        self._exceed_counts = np.zeros(len(CHEMICALS), dtype=np.int64)
+        self._alerts = {}   # row → /alerts/active entry (critical + high rows)
+        self._contam = {}   # row → /alerts/contamination entry (rows over any limit)
+        self._active = self._critical = self._contamination = None
+        self._listeners = []
+        self._watchers  = []
+        self._lock      = threading.RLock()
+        self.refresh()
+
+    def subscribe(self, listener):
+        """listener(changes: list) is called after every refresh that changed an alert."""
+        self._listeners.append(listener)
+
+    def watch(self, listener):
+        """listener(rows: np.ndarray) is called after every refresh with the refreshed row indices."""
+        self._watchers.append(listener)
+
+    def _grow(self, n: int):
+        extra = n - len(self._risk_snap)
+        if extra > 0:
+            self._risk_snap   = np.concatenate([self._risk_snap, np.full(extra, -1, dtype=np.int8)])
+            self._exceed_snap = np.concatenate([self._exceed_snap, np.zeros((extra, len(CHEMICALS)), dtype=bool)])
+
+    def refresh(self, rows=None):
+        """Re-derives the given row indices (all rows by default)."""
+        s = self.store
+        rows = np.arange(len(s)) if rows is None else np.unique(np.asarray(rows, dtype=np.intp))
+
+        with self._lock:
+            self._grow(len(s))
+            # Retire what these rows contributed last time
+            counted = rows[self._risk_snap[rows] >= 0]
+            self._risk_counts   -= np.bincount(self._risk_snap[counted], minlength=len(RISK_LEVELS))
+            self._exceed_counts -= self._exceed_snap[counted].sum(axis=0)
+
+            risk   = s.risk[rows]
+            values = np.stack([s[c][rows] for c in CHEMICALS], axis=1)
+            exceed = values > self._limit_vec
+            self._risk_counts   += np.bincount(risk, minlength=len(RISK_LEVELS))
+            self._exceed_counts += exceed.sum(axis=0)
+            self._risk_snap[rows]   = risk
+            self._exceed_snap[rows] = exceed
+
+            high    = RISK_CODES["high"]
+            changes = []
+            for i, r, vals, ex in zip(rows.tolist(), risk.tolist(), values.tolist(), exceed.tolist()):
+                old = self._alerts.pop(i, None)
+                self._contam.pop(i, None)
+                if r >= high:
+                    self._alerts[i] = self._alert_entry(i, vals, ex)
+                if any(ex):
+                    self._contam[i] = self._contam_entry(i, vals, ex)
+                if self._listeners:
+                    change = self._change(i, old, self._alerts.get(i))
+                    if change:
+                        changes.append(change)
+            self._active = self._critical = self._contamination = None
+        if changes:
+            for listener in self._listeners:
+                listener(changes)
+        for watcher in self._watchers:
+            watcher(rows)
+
+    def _change(self, i: int, old, new):
+        if old == new:
+            return None
+        if new is None:
+            return {"change": "cleared", "key": self.store.key[i], **self._where(i)}
+        if old is None:
+            kind = "raised"
+        else:
+            delta = RISK_CODES[new["risk_level"]] - RISK_CODES[old["risk_level"]]
+            kind  = "escalated" if delta > 0 else "deescalated" if delta < 0 else "updated"
+        return {"change": kind, "key": self.store.key[i], "alert": new}
+
+    def _where(self, i: int) -> dict:
+        """Identifies a row: its state, plus district/id for sub-state rows (wells)."""
+        s = self.store
+        where = {"state": s.state[i]}
+        if s.district[i]:
+            where["district"] = s.district[i]
+        if s.key[i] != s.state[i]:
+            where["id"] = s.key[i]
+        return where
+
+    def _alert_entry(self, i: int, vals: list, ex: list) -> dict:
+        s = self.store
+        return {
+            **self._where(i),
+            "risk_level":           RISK_LEVELS[s.risk[i]],
+            "depth_m":              float(s["depth"][i]),
+            "depletion_m_per_year": float(s["dep"][i]),
+            "risk_score":           float(s["score"][i]),
+            "contamination_alerts": [
+                f"{chem.capitalize()} {v} mg/L ({round(v/self.limits[chem],1)}x limit)"
+                for chem, v, over in zip(CHEMICALS, vals, ex) if over
+            ],
+        }
+
+    def _contam_entry(self, i: int, vals: list, ex: list) -> dict:
+        return {
+            **self._where(i),
+            "issues": [
+                {"type": chem, "value": v, "limit": self.limits[chem],
+                 "times_over": round(v / self.limits[chem], 1)}
+                for chem, v, over in zip(CHEMICALS, vals, ex) if over
+            ],
+        }
+
+    def active(self) -> list:
+        """Critical + high alerts: critical first, then by score descending."""
+        with self._lock:
+            if self._active is None:
+                rows  = np.fromiter(self._alerts, dtype=np.intp, count=len(self._alerts))
+                rows.sort()
+                s     = self.store
+                order = np.lexsort((-s["score"][rows], s.risk[rows] != RISK_CODES["critical"]))
+                self._active = [self._alerts[i] for i in rows[order].tolist()]
+            return self._active
+
+    def critical(self) -> list:
+        with self._lock:
+            if self._critical is None:
+                self._critical = [a for a in self.active() if a["risk_level"] == "critical"]
+            return self._critical
+
+    def contamination(self) -> list:
+        with self._lock:
+            if self._contamination is None:
+                self._contamination = [self._contam[i] for i in sorted(self._contam)]
+            return self._contamination
+
+    def risk_counts(self) -> dict:
+        with self._lock:
+            return {level: int(self._risk_counts[code]) for level, code in RISK_CODES.items()}
+
+    def exceed_pct(self, chemical: str) -> float:
+        with self._lock:
+            total    = int(self._risk_counts.sum())
+            exceeded = int(self._exceed_counts[CHEMICALS.index(chemical)])
+        if total == 0:
+            return 0.0
+        return round(exceeded / total * 100, 1)
@@ -0,0 +1,86 @@
+"""
+AquaSentinel — Server-Sent Events Broadcaster
+Person 1 owns this file.
+One shared in-process fan-out for every connected stream client.
+
+publish() encodes an event once and drops the same bytes into each client's
+queue, so adding clients adds no per-client recomputation or serialization.
+A client whose queue fills up (too slow to keep up) is disconnected; its
+EventSource reconnects and starts again from a fresh snapshot.
+"""
+
+import asyncio
+import json
+
+CLIENT_QUEUE_SIZE = 256
+_CLOSED = None   # queue sentinel: the broadcaster dropped this client
+
+
+def encode(event: str, data, event_id: int = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+class Broadcaster:
+    def __init__(self, queue_size: int = CLIENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._clients = set()
+        self._seq     = 0
+        self._loop    = None
+        self.dropped  = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(self.queue_size)
+        self._clients.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._clients.discard(queue)
+
+    def publish(self, event: str, data):
+        """Sends to every client. Safe to call from the event loop or from a worker thread."""
+        self._seq += 1
+        payload = encode(event, data, self._seq)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._fanout, payload)
+            return
+        self._fanout(payload)
+
+    def _fanout(self, payload: bytes):
+        for queue in list(self._clients):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                self._clients.discard(queue)
+                self.dropped += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(_CLOSED)
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+async def stream(broadcaster: Broadcaster, queue: asyncio.Queue, first: bytes, heartbeat_s: float):
+    """SSE body: `first` (the snapshot), then broadcast events, with comment heartbeats when idle."""
+    try:
+        yield first
+        while True:
+            try:
+                payload = await asyncio.wait_for(queue.get(), heartbeat_s)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if payload is _CLOSED:
+                return
+            yield payload
+    finally:
+        broadcaster.unsubscribe(queue)
@@ -0,0 +1,87 @@
+"""
+AquaSentinel — Columnar Binary Responses
+Person 1 owns this file.
+
+Bulk endpoints (/api/groundwater/all, /risk/{level}, /{state}/history) negotiate on the
+Accept header: a client asking for application/x-msgpack gets one MessagePack document
+of column arrays instead of an array of repeated-key JSON objects:
+
+  {"format": "columnar", "length": N, "columns": {name: column, ...}, ...endpoint fields}
+
+Column encodings:
+  {"type": "float64" | "float32" | "int8" | ..., "data": <bin>}    — typed array, little-endian
+  {"type": "dictionary", "values": [...], "codes": <typed column>} — low-cardinality strings
+  {"type": "string", "data": [str | None, ...]}                     — everything else
+
+Numeric columns are the store's NumPy buffers as raw bytes, so building and decoding them
+costs no per-value work; decodeColumnar in frontend/src/services/api.js maps them onto
+JS typed arrays. Without the msgpack package installed, every client gets JSON.
+"""
+
+import numpy as np
+from fastapi import Request, Response
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MEDIA_TYPE   = "application/x-msgpack"
+ACCEPTED     = {MEDIA_TYPE, "application/msgpack", "application/vnd.msgpack"}
+TYPED_DTYPES = {"float64", "float32", "int8", "int16", "int32", "uint8", "uint16", "uint32"}
+
+
+def wants_columnar(request: Request) -> bool:
+    """True when the Accept header lists a MessagePack type with q > 0."""
+    if msgpack is None:
+        return False
+    for part in request.headers.get("accept", "").split(","):
+        media, *params = [p.strip() for p in part.split(";")]
+        if media.lower() not in ACCEPTED:
+            continue
+        q = next((p[2:] for p in params if p.startswith("q=")), "1")
+        try:
+            if float(q) > 0:
+                return True
+        except ValueError:
+            pass
+    return False
+
+
+def typed(values, dtype=None) -> dict:
+    arr = np.ascontiguousarray(values, dtype=dtype)
+    if arr.dtype.name not in TYPED_DTYPES:
+        raise ValueError(f"no typed-array encoding for {arr.dtype}")
+    return {"type": arr.dtype.name, "data": arr.astype(arr.dtype.newbyteorder("<"), copy=False).tobytes()}
+
+
+def dictionary(values) -> dict:
+    """Strings as a small dictionary plus one code per row ("" and None become null)."""
+    uniq, codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    code_type = np.int8 if len(uniq) <= 127 else np.int16 if len(uniq) <= 32767 else np.int32
+    return {
+        "type":   "dictionary",
+        "values": [v or None for v in uniq.tolist()],
+        "codes":  typed(codes, code_type),
+    }
+
+
+def coded(codes, values: tuple) -> dict:
+    """Already dictionary-coded column: codes index into `values`."""
+    return {"type": "dictionary", "values": list(values), "codes": typed(codes)}
+
+
+def strings(values) -> dict:
+    return {"type": "string", "data": [v or None for v in np.asarray(values, dtype=object).tolist()]}
+
+
+def encode(columns: dict, length: int, **fields) -> bytes:
+    return msgpack.packb({"format": "columnar", "length": int(length), "columns": columns, **fields},
+                         use_bin_type=True)
+
+
+def columnar_response(body: bytes, response: Response = None) -> Response:
+    """Raw MessagePack Response carrying headers set on the injected `response` (ETag, Vary)."""
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"} if response else {}
+    headers["vary"] = "Accept"
+    return Response(body, media_type=MEDIA_TYPE, headers=headers)
@@ -0,0 +1,114 @@
+"""
+AquaSentinel — Micro-Batching Scheduler
+Person 1 owns this file.
+Coalesces concurrent single-item model requests into one batched call.
+
+Requests are queued per group (e.g. forecast horizon). A group's queue is flushed as
+one run_batch(group, items) call when BATCH_WINDOW_MS has passed since its first
+request, or as soon as it holds BATCH_MAX_ITEMS; every caller awaits its own result.
+If the batch call fails, every caller in it gets the exception.
+
+Usage:
+  batcher = MicroBatcher("forecast", run_batch)      # async run_batch(group, items) -> results
+  result  = await batcher.submit(6, ("Goa", record))
+
+status() reports batch-size and queue-wait histograms for tuning the window and limit.
+"""
+
+import os
+import time
+import asyncio
+from bisect import bisect_left
+
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "5"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "64"))
+
+SIZE_BUCKETS    = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+WAIT_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100)
+
+
+class Histogram:
+    """Fixed-bucket counts (upper bounds inclusive; the last bucket is +Inf)."""
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total  = 0
+        self.sum    = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += 1
+        self.sum   += value
+
+    def snapshot(self) -> dict:
+        labels = [f"<={b:g}" for b in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return {
+            "count":   self.total,
+            "mean":    round(self.sum / self.total, 3) if self.total else None,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class MicroBatcher:
+
+    def __init__(self, name: str, run_batch, window_ms: float = BATCH_WINDOW_MS,
+                 max_items: int = BATCH_MAX_ITEMS):
+        self.name, self._run_batch = name, run_batch
+        self.window_s  = max(window_ms, 0) / 1000
+        self.max_items = max(max_items, 1)
+        self._pending  = {}     # group → [(item, future, enqueued_at)]
+        self._timers   = {}     # group → TimerHandle of the scheduled flush
+        self._tasks    = set()
+        self.batch_size = Histogram(SIZE_BUCKETS)
+        self.queue_wait = Histogram(WAIT_BUCKETS_MS)
+
+    async def submit(self, group, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(group, [])
+        pending.append((item, future, time.perf_counter()))
+        if len(pending) >= self.max_items:
+            self._flush(group)
+        elif group not in self._timers:
+            self._timers[group] = loop.call_later(self.window_s, self._flush, group)
+        return await future
+
+    def _flush(self, group):
+        timer = self._timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(group, [])
+        if pending:
+            task = asyncio.get_running_loop().create_task(self._run(group, pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, group, pending: list):
+        now = time.perf_counter()
+        self.batch_size.observe(len(pending))
+        for _, _, enqueued in pending:
+            self.queue_wait.observe((now - enqueued) * 1000)
+        try:
+            results = await self._run_batch(group, [item for item, _, _ in pending])
+        except asyncio.CancelledError:
+            for _, future, _ in pending:
+                future.cancel()
+            raise
+        except Exception as exc:
+            for _, future, _ in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future, _), result in zip(pending, results):
+            if not future.done():      # the caller may have been cancelled meanwhile
+                future.set_result(result)
+
+    def status(self) -> dict:
+        return {
+            "window_ms":     self.window_s * 1000,
+            "max_items":     self.max_items,
+            "queued":        sum(len(p) for p in self._pending.values()),
+            "batch_size":    self.batch_size.snapshot(),
+            "queue_wait_ms": self.queue_wait.snapshot(),
+        }
@@ -0,0 +1,161 @@
+"""
+AquaSentinel — Model Inference Worker Pool
+Person 1 owns this file.
+Runs Person 2's predict functions in separate model-serving processes, so model calls
+never hold the API worker's GIL or threadpool, and TensorFlow is never imported into it.
+
+Each worker is a spawned process (it inherits none of the API's event loop, sockets or
+data) that imports the predict modules once and loads the active models in its
+initializer; the registry's ModelSlot keeps hot-reloading them there. Jobs and results
+travel over the executor's local call/result queues.
+
+Usage:
+  from inference.pool import INFERENCE, forecast_job
+  projected, version = await INFERENCE.run(forecast_job, histories, 6)
+
+INFERENCE_WORKERS=0 runs jobs in the API's threadpool instead (development, single process).
+A job that misses INFERENCE_TIMEOUT_S raises InferenceTimeout; its worker finishes it in the
+background and the other workers keep serving.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from starlette.concurrency import run_in_threadpool
+
+INFERENCE_WORKERS   = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_TIMEOUT_S = float(os.getenv("INFERENCE_TIMEOUT_S", "10"))
+ML_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../ml"))
+
+log = logging.getLogger(__name__)
+
+
+class InferenceTimeout(TimeoutError):
+    pass
+
+
+# ── Worker side ──────────────────────────────────────────────────────
+
+def _init_worker(ml_dir: str):
+    """Imports the predictors and loads the active models once per worker process."""
+    if ml_dir not in sys.path:
+        sys.path.append(ml_dir)
+    from predictors import lstm_predict, xgboost_predict
+    for name, module in (("lstm", lstm_predict), ("xgboost", xgboost_predict)):
+        if not module.model_available():
+            continue
+        try:
+            module.model_version()
+        except Exception:   # unreadable artifacts: the job that needs it reports the error
+            log.warning("inference worker %d could not load %s", os.getpid(), name, exc_info=True)
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def forecast_job(histories: list, steps: int):
+    """(N × steps projected depths, LSTM version that produced them)."""
+    from predictors import lstm_predict
+    return lstm_predict.forecast_depletion_batch(histories, steps=steps), lstm_predict.model_version()
+
+
+def risk_job(records: list):
+    """(one {"risk_score", "risk_label"} per record, XGBoost version that produced them)."""
+    from predictors import xgboost_predict
+    return xgboost_predict.predict_risk_batch(records), xgboost_predict.model_version()
+
+
+# ── API side ─────────────────────────────────────────────────────────
+
+class InferencePool:
+    """Async front end to a lazily started pool of model-serving processes."""
+
+    def __init__(self, workers: int = INFERENCE_WORKERS, timeout: float = INFERENCE_TIMEOUT_S):
+        self.workers, self.timeout = workers, timeout
+        self._executor = None
+        self._lock     = threading.Lock()
+        self._started  = None
+        self._stats    = {"submitted": 0, "completed": 0, "failed": 0, "timed_out": 0, "restarts": 0}
+        self._latency_ms = 0.0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(ML_DIR,),
+                )
+                self._started = time.time()
+            return self._executor
+
+    def start(self):
+        """Spawns every worker now (one no-op each) so the first request doesn't pay for model loading."""
+        if self.workers > 0:
+            pool = self._pool()
+            for _ in range(self.workers):
+                pool.submit(_ready)
+
+    async def run(self, fn, *args, timeout: float = None):
+        """Runs fn(*args) on a worker; raises InferenceTimeout after `timeout` (default INFERENCE_TIMEOUT_S)."""
+        timeout = self.timeout if timeout is None else timeout
+        self._stats["submitted"] += 1
+        started = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                call = run_in_threadpool(fn, *args)
+            else:
+                call = asyncio.get_running_loop().run_in_executor(self._pool(), fn, *args)
+            result = await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            self._stats["timed_out"] += 1
+            raise InferenceTimeout(f"model inference timed out after {timeout:g}s") from None
+        except BrokenProcessPool:
+            # A worker died (OOM, segfault): replace the pool; this request fails, the next one is served
+            self._stats["failed"] += 1
+            self._restart()
+            raise
+        except Exception:
+            self._stats["failed"] += 1
+            raise
+        self._stats["completed"] += 1
+        self._latency_ms = (time.perf_counter() - started) * 1000
+        return result
+
+    def _restart(self):
+        with self._lock:
+            broken, self._executor = self._executor, None
+            self._stats["restarts"] += 1
+        if broken is not None:
+            broken.shutdown(wait=False, cancel_futures=True)
+        log.warning("inference pool broken; restarting %d workers", self.workers)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def status(self) -> dict:
+        in_flight = self._stats["submitted"] - sum(self._stats[k] for k in ("completed", "failed", "timed_out"))
+        return {
+            "mode":        "processes" if self.workers > 0 else "threadpool",
+            "workers":     self.workers,
+            "running":     self._executor is not None,
+            "started_at":  round(self._started, 3) if self._started else None,
+            "timeout_s":   self.timeout,
+            "in_flight":   in_flight,
+            "last_latency_ms": round(self._latency_ms, 1),
+            **self._stats,
+        }
+
+
+INFERENCE = InferencePool()
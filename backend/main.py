@@ -5,14 +5,34 @@ Run: uvicorn main:app --reload --port 8000
 Docs: http://localhost:8000/docs
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routes import groundwater, alerts, forecast, simulator
+from routes import groundwater, alerts, forecast, simulator, ingest, tiles
+from cache.redis_client import cache_status, cache_close
+from routes.simulator import shutdown_pool
+from routes.forecast import start_prewarmer, stop_prewarmer, ML_AVAILABLE
+from inference.pool import INFERENCE
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if ML_AVAILABLE:
+        INFERENCE.start()
+    start_prewarmer()
+    yield
+    await stop_prewarmer()
+    INFERENCE.shutdown()
+    shutdown_pool()
+    tiles.close_tiles()
+    await cache_close()
+
 
 app = FastAPI(
     title="AquaSentinel API",
     description="AI-Powered Groundwater Crisis Intelligence for India — FOOBAR Hackathon 2026",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -26,8 +46,15 @@ app.include_router(groundwater.router, prefix="/api/groundwater", tags=["Groundw
 app.include_router(alerts.router,      prefix="/api/alerts",      tags=["Alerts"])
 app.include_router(forecast.router,    prefix="/api/forecast",    tags=["Forecast"])
 app.include_router(simulator.router,   prefix="/api/simulator",   tags=["Policy Simulator"])
+app.include_router(ingest.router,      prefix="/api/ingest",      tags=["Ingestion"])
+app.include_router(tiles.router,       prefix="/api/tiles",       tags=["Map Tiles"])
 
 
 @app.get("/", tags=["Health"])
 def root():
     return {"status": "running", "version": "1.0.0", "docs": "/docs"}
+
+
+@app.get("/cache", tags=["Health"])
+def cache_stats():
+    return cache_status()
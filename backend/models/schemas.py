@@ -4,7 +4,7 @@ Person 1 owns this file.
 These define the shape of all API request/response data.
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, conint
 from typing import Optional, List
 
 
@@ -57,11 +57,42 @@ class ForecastResponse(BaseModel):
     months_to_crisis: Optional[int]
 
 
+class ForecastBatchInput(BaseModel):
+    states: List[str]
+    months: int = Field(6, ge=1, le=120)
+
+
 class SimulatorInput(BaseModel):
-    dams: int = 3
-    drip_pct: int = 30
-    rwh_units: int = 100
-    crop_diversification: int = 20
+    dams: int = Field(3, ge=0)
+    drip_pct: int = Field(30, ge=0)
+    rwh_units: int = Field(100, ge=0)
+    crop_diversification: int = Field(20, ge=0)
+
+
+class LeverRange(BaseModel):
+    """Either an explicit list of values or an inclusive min..max range with step."""
+    min: int = Field(0, ge=0)
+    max: int = Field(0, ge=0)
+    step: int = Field(1, ge=1)
+    values: Optional[List[conint(ge=0)]] = None
+
+
+class SweepInput(BaseModel):
+    dams: LeverRange = LeverRange(min=0, max=20)
+    drip_pct: LeverRange = LeverRange(min=0, max=100, step=5)
+    rwh_units: LeverRange = LeverRange(min=0, max=500, step=25)
+    crop_diversification: LeverRange = LeverRange(min=0, max=100, step=5)
+    time_budget_ms: Optional[float] = Field(None, gt=0)
+    page: int = Field(1, ge=1)
+    page_size: int = Field(100, ge=1, le=5000)
+
+
+class MonteCarloInput(SimulatorInput):
+    trials: int = Field(5000, ge=100, le=500_000)
+    years: int = Field(10, ge=1, le=50)
+    rainfall_cv: float = Field(0.2, ge=0, le=1)     # year-to-year rainfall variability
+    coeff_cv: float = Field(0.25, ge=0, le=1)       # uncertainty in each lever's effect
+    seed: Optional[int] = None
 
 
 class SimulatorResult(BaseModel):
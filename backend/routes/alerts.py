@@ -5,83 +5,62 @@ Endpoints:
   GET /api/alerts/active    — all active critical + high alerts
   GET /api/alerts/critical  — critical only
   GET /api/alerts/contamination — contamination-specific alerts
+  GET /api/alerts/stream    — Server-Sent Events: active snapshot, then alert diffs
+
+The REST endpoints are served from the materialized views in db/views.py, off the
+event loop: the views lock is held through each refresh on the ingest thread.
+The stream sends one "snapshot" event, then a "diff" event per data change
+with only the alerts that were raised, escalated, deescalated, updated or cleared.
 """
 
-from fastapi import APIRouter
-from db.seed import get_all_states, SAFE_LIMITS
-from cache.redis_client import cache_get, cache_set
+import os
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from db.seed import get_views, data_version
+from cache.response import cached_json
+from cache.etag import conditional, vkey
+from events.broadcaster import Broadcaster, encode, stream
 
 router = APIRouter()
 
+STREAM_HEARTBEAT_S = float(os.getenv("ALERT_STREAM_HEARTBEAT_S", "15"))
+broadcaster = Broadcaster()
 
-def _build_alerts(risk_filter=None):
-    alerts = []
-    for state, d in get_all_states().items():
-        if risk_filter and d["risk"] != risk_filter:
-            continue
-        if d["risk"] not in ("critical", "high"):
-            continue
-
-        contam_alerts = []
-        if d["fluoride"] > SAFE_LIMITS["fluoride"]:
-            contam_alerts.append(
-                f"Fluoride {d['fluoride']} mg/L ({round(d['fluoride']/SAFE_LIMITS['fluoride'],1)}x limit)"
-            )
-        if d["arsenic"] > SAFE_LIMITS["arsenic"]:
-            contam_alerts.append(
-                f"Arsenic {d['arsenic']} mg/L ({round(d['arsenic']/SAFE_LIMITS['arsenic'],1)}x limit)"
-            )
-        if d["iron"] > SAFE_LIMITS["iron"]:
-            contam_alerts.append(
-                f"Iron {d['iron']} mg/L ({round(d['iron']/SAFE_LIMITS['iron'],1)}x limit)"
-            )
+get_views().subscribe(
+    lambda changes: broadcaster.publish("diff", {"version": data_version(), "changes": changes})
+)
 
-        alerts.append({
-            "state":                state,
-            "risk_level":           d["risk"],
-            "depth_m":              d["depth"],
-            "depletion_m_per_year": d["dep"],
-            "risk_score":           d["score"],
-            "contamination_alerts": contam_alerts,
-        })
 
-    # Sort: critical first, then by score descending
-    alerts.sort(key=lambda x: (x["risk_level"] != "critical", -x["risk_score"]))
-    return alerts
+def _build_alerts():
+    return get_views().active()
 
 
-@router.get("/active")
-def get_active_alerts():
-    cached = cache_get("alerts:active")
-    if cached:
-        return cached
-    result = _build_alerts()
-    cache_set("alerts:active", result, ttl=120)
-    return result
+@router.get("/active", dependencies=[Depends(conditional("alerts-active"))])
+async def get_active_alerts(response: Response):
+    return await cached_json(vkey("alerts:active"), _build_alerts, ttl=120, response=response)
 
 
-@router.get("/critical")
+@router.get("/critical", dependencies=[Depends(conditional("alerts-critical"))])
 def get_critical_alerts():
-    return _build_alerts(risk_filter="critical")
+    return get_views().critical()
 
 
-@router.get("/contamination")
+@router.get("/contamination", dependencies=[Depends(conditional("alerts-contamination"))])
 def get_contamination_alerts():
-    alerts = []
-    for state, d in get_all_states().items():
-        issues = []
-        if d["fluoride"] > SAFE_LIMITS["fluoride"]:
-            issues.append({"type": "fluoride", "value": d["fluoride"],
-                           "limit": SAFE_LIMITS["fluoride"],
-                           "times_over": round(d["fluoride"] / SAFE_LIMITS["fluoride"], 1)})
-        if d["arsenic"] > SAFE_LIMITS["arsenic"]:
-            issues.append({"type": "arsenic", "value": d["arsenic"],
-                           "limit": SAFE_LIMITS["arsenic"],
-                           "times_over": round(d["arsenic"] / SAFE_LIMITS["arsenic"], 1)})
-        if d["iron"] > SAFE_LIMITS["iron"]:
-            issues.append({"type": "iron", "value": d["iron"],
-                           "limit": SAFE_LIMITS["iron"],
-                           "times_over": round(d["iron"] / SAFE_LIMITS["iron"], 1)})
-        if issues:
-            alerts.append({"state": state, "issues": issues})
-    return alerts
+    return get_views().contamination()
+
+
+@router.get("/stream")
+async def stream_alerts():
+    # Subscribe before taking the snapshot so no diff can fall between the two. A diff
+    # already reflected in the snapshot is harmless: each change carries the alert's
+    # full new state, and clients apply it by key.
+    queue    = broadcaster.subscribe()
+    alerts   = await run_in_threadpool(get_views().active)
+    snapshot = encode("snapshot", {"version": data_version(), "alerts": alerts}, broadcaster.seq)
+    return StreamingResponse(
+        stream(broadcaster, queue, snapshot, STREAM_HEARTBEAT_S),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
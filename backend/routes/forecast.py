@@ -1,104 +1,455 @@
 """
 AquaSentinel — Forecast Routes
 Person 1 owns this file.
-Calls Person 2's ML predict functions.
+Calls Person 2's ML predict functions through the inference worker pool
+(inference/pool.py), so model runs never block this process; a run that misses
+INFERENCE_TIMEOUT_S answers 504. Concurrent single-state requests are coalesced
+by micro-batchers (inference/batcher.py) into one batched model call.
 Falls back to mathematical simulation if ML model not yet trained.
 
+Forecasts and contamination scores are precomputed for every state by a background
+worker (started from the app lifespan) and refreshed before their cache entries expire,
+so handlers normally only read a warm cache. Only state-level rows are pre-warmed, and a
+data change (an ingest batch) triggers a refresh at most once per FORECAST_PREWARM_MIN_INTERVAL_S.
+
 Endpoints:
+  GET  /api/forecast/all            — 6-month forecast for every state (one batched model run)
+  GET  /api/forecast/status         — pre-warmer state and when each cache entry was last refreshed
+  POST /api/forecast/batch          — 6-month forecast for a list of states
   GET  /api/forecast/{state}        — 6-month LSTM depletion forecast
+  GET  /api/forecast/contamination/all     — XGBoost risk score for every state (one model call)
   GET  /api/forecast/contamination/{state} — XGBoost risk score
 """
-from fastapi import APIRouter, HTTPException
-from db.seed import get_state
-from cache.redis_client import cache_get, cache_set
-import math, random, sys, os
+from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from db.seed import get_state, get_state_level, data_version, data_tag
+from db.timeseries import get_series_store
+from models.schemas import ForecastBatchInput
+from cache.redis_client import cache_mget, cache_mset, cache_get_or_set
+from cache.etag import conditional, vkey
+from inference.pool import INFERENCE, InferenceTimeout, forecast_job, risk_job
+from inference.batcher import MicroBatcher
+import sys, os, time, zlib, asyncio, logging
+from functools import partial
+import numpy as np
 router = APIRouter()
 try:
     sys.path.append(os.path.join(os.path.dirname(__file__), "../../ml"))
-    from lstm.predict import forecast_depletion
-    from xgboost_model.predict import predict_risk_score
+    from predictors import lstm_predict, xgboost_predict
+    from registry import active_version, UNVERSIONED
     ML_AVAILABLE = True
 except Exception:
     ML_AVAILABLE = False
-def _math_forecast(depth: float, rate: float, steps: int = 6):
+FORECAST_STEPS = 6
+MAX_FORECAST_STEPS   = 120
+HISTORY_MONTHS       = 12
+FORECAST_SEED        = int(os.getenv("FORECAST_SEED", "2026"))
+SEASONAL_AMPLITUDE_M = 1.5
+CRISIS_DEPTH_M       = 50
+CRISIS_SEARCH_MONTHS = 1200
+CRISIS_GRID_CELLS    = 1 << 20    # months × rows evaluated at once by _months_to_crisis
+FORECAST_TTL        = int(os.getenv("FORECAST_CACHE_TTL", "300"))
+PREWARM_ENABLED     = os.getenv("FORECAST_PREWARM", "1") != "0"
+PREWARM_INTERVAL_S  = float(os.getenv("FORECAST_REFRESH_S", str(FORECAST_TTL * 0.8)))
+PREWARM_MIN_INTERVAL_S = float(os.getenv("FORECAST_PREWARM_MIN_INTERVAL_S", "15"))
+PREWARM_POLL_S      = 1.0
+log = logging.getLogger(__name__)
+def _math_forecast_batch(names: list, depths, rates, steps: int = FORECAST_STEPS):
     """
     Mathematical fallback used until Person 2's LSTM model is ready.
-    Simulates seasonal pattern + depletion trend.
-    """
-    historical = []
-    for i in range(12, 0, -1):
-        seasonal = 1.5 * math.sin(2 * math.pi * i / 12)
-        noise = random.uniform(-0.3, 0.3)
-        historical.append(round(depth - (rate * i / 12) + seasonal + noise, 2))
-    forecast = []
-    for i in range(1, steps + 1):
-        seasonal = 1.5 * math.sin(2 * math.pi * (12 + i) / 12)
-        projected = depth + (rate * i / 12) + seasonal
-        band = 0.4 * i
-        forecast.append({
-            "month": i,
-            "predicted_depth": round(projected, 2),
-            "lower_bound":     round(projected - band, 2),
-            "upper_bound":     round(projected + band, 2),
-        })
-    return historical, forecast
-@router.get("/{state_name}")
-def get_forecast(state_name: str):
-    data = get_state(state_name)
-    if not data:
-        raise HTTPException(status_code=404, detail=f"State '{state_name}' not found")
-    cache_key = f"forecast:{state_name}"
-    cached = cache_get(cache_key)
-    if cached:
-        return cached
+    Seasonal pattern + depletion trend for every state and month in one array operation.
+    History noise is seeded per state (FORECAST_SEED, state name), so the same inputs
+    always give the same curve no matter which batch a state is built in.
+    Returns (historical (N, 12), projected (N, steps), band (steps,)).
+    """
+    depth = np.asarray(depths, dtype=float)[:, None]
+    rate  = np.asarray(rates, dtype=float)[:, None]
+    past  = np.arange(HISTORY_MONTHS, 0, -1)
+    ahead = np.arange(1, steps + 1)
+    noise = np.stack([
+        np.random.default_rng([FORECAST_SEED, zlib.crc32(name.encode())]).uniform(-0.3, 0.3, HISTORY_MONTHS)
+        for name in names
+    ]) if names else np.empty((0, HISTORY_MONTHS))
+    historical = depth - rate * past / 12 + _seasonal(past) + noise
+    projected  = _curve(depth, rate, ahead)
+    return historical, projected, 0.4 * ahead
+def _seasonal(month):
+    return SEASONAL_AMPLITUDE_M * np.sin(2 * np.pi * month / 12)
+def _curve(depth, rate, month):
+    """Projected depth `month` months ahead (month 0 = now, the seasonal phase of month 12)."""
+    return depth + rate * month / 12 + _seasonal(12 + month)
+def _first_crossing(t, curve):
+    """
+    Month at which each row of `curve` (depths sampled at months `t`, same shape) first
+    reaches CRISIS_DEPTH_M, interpolated linearly inside the crossing month; NaN if never.
+    """
+    hit   = curve >= CRISIS_DEPTH_M
+    first = hit.argmax(axis=1)
+    rows  = np.arange(len(curve))
+    prev  = np.maximum(first - 1, 0)
+    before, after = curve[rows, prev], curve[rows, first]
+    frac  = np.where(after > before, (CRISIS_DEPTH_M - before) / np.where(after > before, after - before, 1), 1)
+    month = t[rows, prev] + (t[rows, first] - t[rows, prev]) * frac
+    return np.where(hit.any(axis=1), month, np.nan)
+def _months_to_crisis(depths, rates) -> list:
+    """
+    First month the projected curve reaches CRISIS_DEPTH_M, for every state at once.
+    The curve lies within ±SEASONAL_AMPLITUDE_M of its trend, so each row is searched only
+    over its own window of months where the trend is within that amplitude of the threshold.
+    Rows are taken in chunks of similar window width, at most CRISIS_GRID_CELLS grid cells
+    each. None when already in crisis or not reached within CRISIS_SEARCH_MONTHS.
+    """
+    depth = np.asarray(depths, dtype=float)
+    rate  = np.asarray(rates, dtype=float)
+    months = np.full(len(depth), np.nan)
+    # A flat or recovering curve peaks within its first seasonal cycle: only rows already within
+    # the amplitude of the threshold can reach it, and only in the first 12 months
+    live  = np.flatnonzero((depth < CRISIS_DEPTH_M) &
+                           ((rate > 0) | (depth >= CRISIS_DEPTH_M - SEASONAL_AMPLITUDE_M)))
+    d, r  = depth[live], rate[live]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lo = np.where(r > 0, np.floor(np.maximum(12 * (CRISIS_DEPTH_M - SEASONAL_AMPLITUDE_M - d) / r - 1, 0)), 0)
+        hi = np.where(r > 0, np.ceil(np.minimum(12 * (CRISIS_DEPTH_M + SEASONAL_AMPLITUDE_M - d) / r,
+                                                CRISIS_SEARCH_MONTHS)), 12)
+    keep  = lo < CRISIS_SEARCH_MONTHS
+    live, d, r, lo, hi = live[keep], d[keep], r[keep], lo[keep], hi[keep]
+
+    order = np.argsort(hi - lo, kind="stable")
+    fits  = CRISIS_GRID_CELLS // (hi - lo + 1).astype(np.int64)[order]   # rows per chunk at each width
+    start = 0
+    while start < len(order):
+        ok    = np.arange(1, len(order) - start + 1) <= fits[start:]
+        end   = start + (max(int(ok.argmin()), 1) if not ok.all() else len(order) - start)
+        chunk = order[start:end]
+        t     = np.minimum(lo[chunk, None] + np.arange(int((hi - lo)[chunk].max()) + 1), CRISIS_SEARCH_MONTHS)
+        months[live[chunk]] = _first_crossing(t, _curve(d[chunk, None], r[chunk, None], t))
+        start = end
+    return [round(float(m)) if not np.isnan(m) else None for m in months]
+def _curve_crisis(depths, projected) -> tuple:
+    """(months to crisis, will reach critical) read off model-projected curves, month 0 = now."""
+    depth  = np.asarray(depths, dtype=float)
+    curve  = np.column_stack([depth, np.asarray(projected, dtype=float)])
+    t      = np.broadcast_to(np.arange(curve.shape[1]), curve.shape)
+    months = _first_crossing(t, curve)
+    months[depth >= CRISIS_DEPTH_M] = np.nan
+    return ([round(float(m)) if not np.isnan(m) else None for m in months],
+            (depth >= CRISIS_DEPTH_M) | ~np.isnan(months))
+def _forecast_points(values, band) -> list:
+    return [
+        {"month": i + 1,
+         "predicted_depth": round(v, 2),
+         "lower_bound":     round(max(v - b, 0.0), 2),
+         "upper_bound":     round(v + b, 2)}
+        for i, (v, b) in enumerate(zip(values, band))
+    ]
+def _ml_ready(name: str) -> bool:
+    """Whether model `name` is trained; until it is, its results come from the fallback."""
+    return ML_AVAILABLE and {"lstm": lstm_predict, "xgboost": xgboost_predict}[name].model_available()
+_serving = {"lstm": None, "xgboost": None}    # version the latest inference job of each model reported
+def _model_versions() -> dict:
+    """
+    Model versions the cache keys are scoped to (None while a model is on the fallback):
+    the version its latest inference job reported. Workers swap models on their own schedule,
+    so the manifest's active version stands in only until a job has run.
+    """
+    return {name: (_serving[name] or active_version(name) or UNVERSIONED) if _ml_ready(name) else None
+            for name in _serving}
+def _model_tag() -> str:
+    models = _model_versions()
+    return f"@{models['lstm']}+{models['xgboost']}" if any(models.values()) else ""
+def _key(key: str, model: str, version: str = None, models: dict = None) -> str:
+    """
+    vkey() further scoped to the version of the model behind the entry, so a hot swap never
+    serves stale entries. Writes pass the `models` a result reports, so a result is only ever
+    filed under the version that actually produced it.
+    """
+    tag = (models or _model_versions())[model]
+    return vkey(f"{key}@{tag}" if tag else key, version)
+def _list_key(key: str, model: str, results: list, version: str = None):
+    """_key() for a list of results; None (not cached) if they came from different model versions."""
+    versions = {r["model_versions"][model] for r in results}
+    if len(versions) > 1:
+        return None
+    return _key(key, model, version, {model: versions.pop()} if versions else None)
+def _forecast_result(state_name: str, data: dict, historical: list, forecast: list, model_name: str,
+                     months_to_crisis, will_reach_critical: bool, model_versions: dict) -> dict:
     depth = data["depth"]
     rate  = data["dep"]
-    if ML_AVAILABLE:
-        # Use Person 2's trained LSTM
-        historical = [depth - (rate * i / 12) for i in range(12, 0, -1)]
-        raw_forecast = forecast_depletion(historical, steps=6)
-        forecast = [
-            {"month": i + 1,
-             "predicted_depth": round(v, 2),
-             "lower_bound": round(v - 0.4 * (i + 1), 2),
-             "upper_bound": round(v + 0.4 * (i + 1), 2)}
-            for i, v in enumerate(raw_forecast)
-        ]
-        model_name = "LSTM Neural Network (TensorFlow/Keras)"
-    else:
-        historical, forecast = _math_forecast(depth, rate)
-        model_name = "Mathematical Simulation (LSTM model loading...)"
-    result = {
+    return {
         "state":                state_name,
         "current_depth_m":      depth,
         "annual_depletion_m":   rate,
         "model":                model_name,
         "confidence":           0.87,
         "historical_12m":       historical,
-        "forecast_6m":          forecast,
-        "will_reach_critical":  (depth + rate) > 50,
-        "months_to_crisis":     round((50 - depth) / (rate / 12)) if depth < 50 and rate > 0 else None,
+        "forecast_6m":          forecast,      # `horizon_months` points; name kept for existing clients
+        "horizon_months":       len(forecast),
+        "will_reach_critical":  bool(will_reach_critical),
+        "months_to_crisis":     months_to_crisis,
+        "model_versions":       model_versions,
     }
-    cache_set(cache_key, result, ttl=300)
-    return result
-@router.get("/contamination/{state_name}")
-def get_contamination_risk(state_name: str):
+def _history_12m(state_name: str, data: dict) -> list:
+    """Last 12 real months from the time-series store; linear back-fill if none recorded."""
+    series = get_series_store()
+    if series is not None and state_name in series:
+        window = series.last(state_name, 12)
+        if len(window) == 12 and not np.isnan(window).any():
+            return [round(v, 2) for v in window.tolist()]
+    return [data["depth"] - (data["dep"] * i / 12) for i in range(12, 0, -1)]
+async def _infer(fn, *args):
+    """Runs a model job on the inference pool; a timeout becomes 504 for the caller."""
+    try:
+        return await INFERENCE.run(fn, *args)
+    except InferenceTimeout as exc:
+        raise HTTPException(status_code=504, detail=str(exc))
+async def _build_forecasts(states: dict, steps: int = FORECAST_STEPS) -> list:
+    """
+    Forecasts every state in `states` ({name: seed record}) together.
+    With the LSTM available this is a single batched model run for all of them on an
+    inference worker; otherwise one vectorized pass of the mathematical engine.
+    """
+    names  = list(states)
+    models = _model_versions()
+    depths = [d["depth"] for d in states.values()]
+    rates  = [d["dep"] for d in states.values()]
+    if _ml_ready("lstm"):
+        # Use Person 2's trained LSTM
+        histories = [_history_12m(name, d) for name, d in states.items()]
+        projected, models["lstm"] = await _infer(forecast_job, histories, steps)
+        _serving["lstm"] = models["lstm"]
+        band      = 0.4 * np.arange(1, steps + 1)
+        # The crisis fields describe the curve this response actually returns
+        crisis, critical = _curve_crisis(depths, projected)
+        model_name = f"LSTM Neural Network ({lstm_predict.backend_label()})"
+    else:
+        histories, projected, band = await run_in_threadpool(_math_forecast_batch, names, depths, rates, steps)
+        crisis     = await run_in_threadpool(_months_to_crisis, depths, rates)
+        critical   = [(d + r) > CRISIS_DEPTH_M for d, r in zip(depths, rates)]
+        histories  = np.round(histories, 2).tolist()
+        projected  = np.asarray(projected).tolist()
+        model_name = "Mathematical Simulation (LSTM model loading...)"
+    band = band.tolist()
+    return [
+        _forecast_result(name, data, historical, _forecast_points(values, band), model_name, months, will, models)
+        for (name, data), historical, values, months, will in zip(states.items(), histories, projected, crisis, critical)
+    ]
+async def _run_forecast_batch(steps: int, items: list) -> list:
+    built = {r["state"]: r for r in await _build_forecasts(dict(items), steps)}
+    return [built[name] for name, _ in items]
+async def _run_contamination_batch(_, items: list) -> list:
+    built = {r["state"]: r for r in await _build_contamination(dict(items))}
+    return [built[name] for name, _ in items]
+_forecast_batcher      = MicroBatcher("forecast", _run_forecast_batch)
+_contamination_batcher = MicroBatcher("contamination", _run_contamination_batch)
+def _forecast_key(state_name: str, steps: int, version: str = None, models: dict = None) -> str:
+    key = f"forecast:{state_name}"
+    return _key(key if steps == FORECAST_STEPS else f"{key}:{steps}m", "lstm", version, models)
+async def _cached_forecasts(state_names: list, steps: int = FORECAST_STEPS) -> list:
+    """Serves cached forecasts (one MGET) and computes all misses in one batch (one MSET)."""
+    cached  = await cache_mget([_forecast_key(name, steps) for name in state_names])
+    results = dict(zip(state_names, cached))
+    missing = {name: get_state(name) for name, value in results.items() if not value}
+    if missing:
+        built = await _build_forecasts(missing, steps)
+        await cache_mset({_forecast_key(r["state"], steps, models=r["model_versions"]): r for r in built},
+                         ttl=FORECAST_TTL)
+        results.update((r["state"], r) for r in built)
+    return [results[name] for name in state_names]
+@router.get("/all")
+async def get_all_forecasts(months: int = Query(FORECAST_STEPS, ge=1, le=MAX_FORECAST_STEPS)):
+    key = "forecast:all" if months == FORECAST_STEPS else f"forecast:all:{months}m"
+    return await cache_get_or_set(
+        _key(key, "lstm"),
+        partial(_cached_forecasts, list(get_state_level()), months),
+        ttl=FORECAST_TTL,
+        store_key=partial(_list_key, key, "lstm"),
+    )
+
+
+@router.get("/status")
+def get_prewarm_status():
+    now = time.time()
+    return {
+        "enabled":      PREWARM_ENABLED,
+        "running":      _prewarm_task is not None and not _prewarm_task.done(),
+        "interval_s":   PREWARM_INTERVAL_S,
+        "min_interval_s": PREWARM_MIN_INTERVAL_S,
+        "ttl_s":        FORECAST_TTL,
+        "data_version": data_version(),
+        "model_versions": _model_versions(),
+        "inference":    INFERENCE.status(),
+        "batching":     {b.name: b.status() for b in (_forecast_batcher, _contamination_batcher)},
+        "last_run":     _prewarm_state["last_run"],
+        "last_error":   _prewarm_state["last_error"],
+        "entries": {
+            key: {"refreshed_at": round(at, 3), "age_s": round(now - at, 1)}
+            for key, at in sorted(_prewarm_state["refreshed"].items())
+        },
+    }
+@router.post("/batch")
+async def get_batch_forecast(params: ForecastBatchInput):
+    unknown = [s for s in params.states if not get_state(s)]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"States not found: {unknown}")
+    return await _cached_forecasts(list(dict.fromkeys(params.states)), params.months)
+@router.get("/{state_name}")
+async def get_forecast(state_name: str, months: int = Query(FORECAST_STEPS, ge=1, le=MAX_FORECAST_STEPS)):
     data = get_state(state_name)
     if not data:
         raise HTTPException(status_code=404, detail=f"State '{state_name}' not found")
-    if ML_AVAILABLE:
-        score = predict_risk_score({
-            "depth_m":         data["depth"],
-            "extraction_rate": data["dep"],
-            "fluoride_hist":   data["fluoride"],
-            "arsenic_hist":    data["arsenic"],
-            "iron_hist":       data["iron"],
-        })
-    else:
-        score = data["score"]
+    return await cache_get_or_set(
+        _forecast_key(state_name, months),
+        partial(_forecast_batcher.submit, months, (state_name, data)),
+        ttl=FORECAST_TTL,
+        store_key=lambda r: _forecast_key(state_name, months, models=r["model_versions"]),
+    )
+def _contamination_features(data: dict) -> dict:
     return {
-        "state":      state_name,
-        "risk_score": score,
-        "risk_level": data["risk"],
-        "model":      "XGBoost Classifier",
+        "depth_m":         data["depth"],
+        "extraction_rate": data["dep"],
+        "fluoride_hist":   data["fluoride"],
+        "arsenic_hist":    data["arsenic"],
+        "iron_hist":       data["iron"],
+    }
+async def _build_contamination(states: dict) -> list:
+    """Scores every state in `states` ({name: seed record}) with a single model call."""
+    models = _model_versions()
+    if _ml_ready("xgboost"):
+        results, models["xgboost"] = await _infer(
+            risk_job, [_contamination_features(d) for d in states.values()])
+        _serving["xgboost"] = models["xgboost"]
+        scores = [r["risk_score"] for r in results]
+    else:
+        scores = [d["score"] for d in states.values()]
+    return [
+        {
+            "state":          state_name,
+            "risk_score":     score,
+            "risk_level":     data["risk"],
+            "model":          "XGBoost Classifier",
+            "model_versions": models,
+        }
+        for (state_name, data), score in zip(states.items(), scores)
+    ]
+@router.get("/contamination/all",
+            dependencies=[Depends(conditional(lambda: "forecast-contamination" + _model_tag()))])
+async def get_all_contamination_risk():
+    return await cache_get_or_set(
+        _key("contamination:all", "xgboost"),
+        partial(_build_contamination, get_state_level()),
+        ttl=FORECAST_TTL,
+        store_key=partial(_list_key, "contamination:all", "xgboost"),
+    )
+@router.get("/contamination/{state_name}")
+async def get_contamination_risk(state_name: str):
+    data = get_state(state_name)
+    if not data:
+        raise HTTPException(status_code=404, detail=f"State '{state_name}' not found")
+    key = f"contamination:{state_name}"
+    return await cache_get_or_set(
+        _key(key, "xgboost"),
+        partial(_contamination_batcher.submit, None, (state_name, data)),
+        ttl=FORECAST_TTL,
+        store_key=lambda r: _key(key, "xgboost", models=r["model_versions"]),
+    )
+
+
+# ── Background pre-warmer ────────────────────────────────────────────
+
+_prewarm_task  = None
+_prewarm_state = {"last_run": None, "last_error": None, "refreshed": {}}
+
+
+async def prewarm() -> dict:
+    """
+    Rebuilds the forecast and contamination entry of every state-level row (one batched
+    model call each) plus the /all lists, and writes them with one MSET under the current data tag
+    and the model versions that produced them.
+    """
+    started = time.time()
+    version, tag = data_version(), data_tag()
+    states  = get_state_level()
+    forecasts, contamination = await asyncio.gather(_build_forecasts(states), _build_contamination(states))
+
+    entries = {f"forecast:{r['state']}": r for r in forecasts}
+    entries.update((f"contamination:{r['state']}", r) for r in contamination)
+    entries["forecast:all"]      = forecasts
+    entries["contamination:all"] = contamination
+
+    def cache_key(key, value):
+        model = "lstm" if key.startswith("forecast:") else "xgboost"
+        if isinstance(value, list):
+            return _list_key(key, model, value, tag)
+        return _key(key, model, tag, value["model_versions"])
+    keyed = {cache_key(key, value): value for key, value in entries.items()}
+    keyed.pop(None, None)
+    await cache_mset(keyed, ttl=FORECAST_TTL)
+
+    finished = time.time()
+    _prewarm_state["refreshed"] = dict.fromkeys(entries, finished)
+    _prewarm_state["last_run"]  = {
+        "started_at":   round(started, 3),
+        "duration_ms":  round((finished - started) * 1000, 1),
+        "data_version": version,
+        "model_versions": _model_versions(),
+        "states":       len(states),
     }
+    return _prewarm_state["last_run"]
+
+
+def _prewarm_inputs() -> tuple:
+    """(data version, active manifest versions, serving versions); a change triggers a refresh."""
+    activated = {name: (active_version(name) or UNVERSIONED) if _ml_ready(name) else None for name in _serving}
+    return data_version(), activated, _model_versions()
+
+
+async def _prewarm_loop():
+    """
+    Refreshes on a schedule inside the TTL, right away whenever a newly activated model
+    version starts serving, and when the data version moves — at most once per
+    PREWARM_MIN_INTERVAL_S there, since ingestion bumps it with every batch. While the
+    workers are still loading an activated version, the refresh is retried with a doubling
+    delay, so one that never loads costs a handful of runs rather than one every poll.
+    """
+    warmed_for, warmed_at = None, float("-inf")
+    retry_s, retry_at = 0.0, float("inf")
+    while True:
+        current = _prewarm_inputs()
+        now     = time.monotonic()
+        models_changed = warmed_for is None or current[1:] != warmed_for[1:]
+        data_changed   = (not models_changed and current[0] != warmed_for[0]
+                          and now - warmed_at >= PREWARM_MIN_INTERVAL_S)
+        if models_changed or data_changed or now - warmed_at >= PREWARM_INTERVAL_S or now >= retry_at:
+            try:
+                run = await prewarm()
+                _prewarm_state["last_error"] = None
+                # What the run actually saw; the versions are the ones its jobs reported
+                current = (run["data_version"], current[1], _model_versions())
+            except Exception as exc:    # keep the worker alive; handlers still compute on a miss
+                log.exception("forecast pre-warm failed")
+                _prewarm_state["last_error"] = f"{type(exc).__name__}: {exc}"
+            warmed_for, warmed_at = current, time.monotonic()
+            if current[1] != current[2]:
+                retry_s  = min(max(2 * retry_s, PREWARM_POLL_S), PREWARM_INTERVAL_S)
+                retry_at = warmed_at + retry_s
+            else:
+                retry_s, retry_at = 0.0, float("inf")
+        await asyncio.sleep(PREWARM_POLL_S)
+
+
+def start_prewarmer():
+    global _prewarm_task
+    if PREWARM_ENABLED and _prewarm_task is None:
+        _prewarm_task = asyncio.get_running_loop().create_task(_prewarm_loop())
+    return _prewarm_task
+
+
+async def stop_prewarmer():
+    global _prewarm_task
+    if _prewarm_task is not None:
+        _prewarm_task.cancel()
+        try:
+            await _prewarm_task
+        except asyncio.CancelledError:
+            pass
+        _prewarm_task = None
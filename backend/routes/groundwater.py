@@ -6,58 +6,189 @@ Endpoints:
   GET /api/groundwater/stats        — national statistics
   GET /api/groundwater/{state}      — single state detail
   GET /api/groundwater/risk/{level} — filter by risk level
+  GET /api/groundwater/bbox         — readings inside a map viewport
+  GET /api/groundwater/near         — k nearest readings to a point
+  GET /api/groundwater/{state}/history — monthly depth history (from/to month index)
+
+/all, /risk/{level} and /{state}/history also answer in the columnar MessagePack format
+(formats/columnar.py) when the request sends Accept: application/x-msgpack.
 """
 
-from fastapi import APIRouter, HTTPException
-from db.seed import get_all_states, get_state, get_states_by_risk, national_stats, contam_exceeds, SAFE_LIMITS
-from cache.redis_client import cache_get, cache_set
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from db.seed import get_state, get_states_by_risk, get_store, national_stats, contam_exceeds, SAFE_LIMITS
+from db.store import NUMERIC_FIELDS, RISK_LEVELS
+from db.timeseries import get_series_store
+from cache.redis_client import cache_get_or_set
+from cache.response import cached_json, dumps, json_response
+from cache.etag import conditional, vkey
+from formats.columnar import wants_columnar, columnar_response, encode, typed, coded, dictionary, strings
 
 router = APIRouter()
 
 
-@router.get("/all")
-def get_all():
-    cached = cache_get("gw:all")
-    if cached:
-        return cached
-
-    result = []
-    for state, d in get_all_states().items():
-        result.append({
+def _readings(store, rows) -> list:
+    """
+    Reading dicts for the given rows, built from column slices (one .tolist() per column)
+    rather than per-row store lookups. Sub-state rows (wells added through /api/ingest)
+    also carry their district and id.
+    """
+    rows = np.asarray(rows, dtype=np.intp)
+    risk = [RISK_LEVELS[r] for r in store.risk[rows].tolist()]
+    readings = []
+    for key, state, district, depth, dep, level, score, lat, lng in zip(
+            store.key[rows].tolist(), store.state[rows].tolist(), store.district[rows].tolist(),
+            store["depth"][rows].tolist(), store["dep"][rows].tolist(), risk, store["score"][rows].tolist(),
+            store["lat"][rows].tolist(), store["lng"][rows].tolist()):
+        reading = {
             "state":              state,
-            "depth_m":            d["depth"],
-            "depletion_per_year": d["dep"],
-            "risk_level":         d["risk"],
-            "risk_score":         d["score"],
-            "latitude":           d["lat"],
-            "longitude":          d["lng"],
-        })
+            "depth_m":            depth,
+            "depletion_per_year": dep,
+            "risk_level":         level,
+            "risk_score":         score,
+            "latitude":           lat,
+            "longitude":          lng,
+        }
+        if district:
+            reading["district"] = district
+        if key != state:
+            reading["id"] = key
+        readings.append(reading)
+    return readings
+
+
+def _all_readings() -> list:
+    store = get_store()
+    with store.lock.read():
+        return _readings(store, np.arange(len(store)))
+
+
+def _all_columnar() -> bytes:
+    """Every reading as columns, straight from the store's arrays (same fields as _reading)."""
+    store = get_store()
+    with store.lock.read():
+        return _encode_all(store)
+
+
+def _encode_all(store) -> bytes:
+    return encode({
+        "state":              dictionary(store.state),
+        "depth_m":            typed(store["depth"]),
+        "depletion_per_year": typed(store["dep"]),
+        "risk_level":         coded(store.risk, RISK_LEVELS),
+        "risk_score":         typed(store["score"]),
+        "latitude":           typed(store["lat"]),
+        "longitude":          typed(store["lng"]),
+        "district":           dictionary(store.district),
+        "id":                 strings(np.where(store.key != store.state, store.key, None)),
+    }, len(store))
 
-    cache_set("gw:all", result, ttl=300)
-    return result
 
+@router.get("/all", dependencies=[Depends(conditional("gw-all", negotiated=True))])
+async def get_all(request: Request, response: Response):
+    if wants_columnar(request):
+        body = await cache_get_or_set(vkey("gw:all:columnar"), _all_columnar, ttl=300, encoded="binary")
+        return columnar_response(body, response)
+    return await cached_json(
+        vkey("gw:all"),
+        _all_readings,
+        ttl=300,
+        response=response,
+    )
 
-@router.get("/stats")
-def get_stats():
-    cached = cache_get("gw:stats")
-    if cached:
-        return cached
-    result = national_stats()
-    cache_set("gw:stats", result, ttl=600)
-    return result
+
+# /bbox, /near and /history are plain functions: FastAPI runs them in the threadpool,
+# off the event loop, and the payloads are encoded straight to JSON bytes
+
+@router.get("/bbox")
+def get_in_bbox(
+    min_lat: float = Query(..., ge=-90,  le=90),
+    min_lng: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90,  le=90),
+    max_lng: float = Query(..., ge=-180, le=180),
+    limit:   int   = Query(5000, ge=1, le=100000),
+):
+    if min_lat > max_lat or min_lng > max_lng:
+        raise HTTPException(status_code=400, detail="min_lat/min_lng must not exceed max_lat/max_lng")
+    store = get_store()
+    with store.lock.read():
+        rows = store.spatial.bbox(min_lat, min_lng, max_lat, max_lng)
+        body = {"total": int(len(rows)), "readings": _readings(store, rows[:limit])}
+    return json_response(dumps(body))
+
+
+@router.get("/near")
+def get_nearest(
+    lat: float = Query(..., ge=-90,  le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    k:   int   = Query(10, ge=1, le=1000),
+):
+    store = get_store()
+    with store.lock.read():
+        rows, dist = store.spatial.nearest(lat, lng, k)
+        readings = _readings(store, rows)
+    for reading, d in zip(readings, dist.tolist()):
+        reading["distance_km"] = round(d, 2)
+    return json_response(dumps(readings))
+
+
+@router.get("/stats", dependencies=[Depends(conditional("gw-stats"))])
+async def get_stats(response: Response):
+    return await cached_json(vkey("gw:stats"), national_stats, ttl=600, response=response)
 
 
 @router.get("/risk/{level}")
-def get_by_risk(level: str):
+async def get_by_risk(level: str, request: Request, response: Response):
     valid = {"critical", "high", "moderate", "low"}
     if level not in valid:
         raise HTTPException(status_code=400, detail=f"level must be one of {valid}")
+    response.headers["Vary"] = "Accept"
+    if wants_columnar(request):
+        store = get_store()
+        with store.lock.read():
+            rows = store.by_risk[level]
+            body = encode({
+                "state": strings(store.key[rows]),
+                **{f: typed(store[f][rows]) for f in NUMERIC_FIELDS},
+                "risk":  coded(store.risk[rows], RISK_LEVELS),
+            }, len(rows))
+        return columnar_response(body, response)
     states = get_states_by_risk(level)
     return [{"state": k, **v} for k, v in states.items()]
 
 
+@router.get("/{state_name}/history")
+def get_history(
+    state_name: str,
+    request: Request,
+    response: Response,
+    start: int = Query(None, alias="from", ge=0),
+    end:   int = Query(None, alias="to",   ge=0),
+):
+    series = get_series_store()
+    if series is None or state_name not in series:
+        raise HTTPException(status_code=404, detail=f"No history for '{state_name}'")
+    first, last = series.bounds(state_name)
+    values = series.range(state_name, start, end)
+    frm    = first if start is None else max(start, first)
+    response.headers["Vary"] = "Accept"
+    if wants_columnar(request):
+        # float32 as stored; NaN marks a gap (null in JSON)
+        return columnar_response(encode(
+            {"depth_m": typed(values, np.float32)}, len(values),
+            state=state_name, **{"from": frm, "to": frm + len(values) - 1, "available": [first, last]},
+        ), response)
+    return json_response(dumps({
+        "state":     state_name,
+        "from":      frm,
+        "to":        frm + len(values) - 1,
+        "available": [first, last],
+        "depth_m":   [None if v != v else round(v, 3) for v in values.tolist()],   # NaN gap → null
+    }), response)
+
+
 @router.get("/{state_name}")
-def get_single_state(state_name: str):
+async def get_single_state(state_name: str):
     data = get_state(state_name)
     if not data:
         raise HTTPException(status_code=404, detail=f"State '{state_name}' not found")
@@ -0,0 +1,121 @@
+"""
+AquaSentinel — Ingestion Routes
+Person 1 owns this file.
+Endpoints:
+  POST /api/ingest   — stream sensor / lab readings as NDJSON or CSV
+
+The body is read in chunks and applied in batches of INGEST_BATCH_ROWS lines,
+so memory stays bounded however large the upload is. Content-Type text/csv
+selects CSV (first line is the header); anything else is read as NDJSON.
+See db/ingest.py for fields and validation rules.
+
+Parsing, validation and apply run in the threadpool, never on the event loop.
+A batch is validated and planned under the store's read lock, scored with the
+XGBoost risk job on the inference pool (or the labelling rule) holding no lock, and
+only its writes hold the write lock (db/store.py) that every reader waits on.
+Batches go through that sequence one at a time, so a plan is still valid when applied.
+"""
+
+import os
+import csv
+import time
+import asyncio
+import logging
+from fastapi import APIRouter, Request
+from starlette.concurrency import run_in_threadpool
+from db.seed import get_store, get_views
+from db.ingest import parse_ndjson, parse_csv, validate, plan, apply, MAX_ERRORS
+from db import risk
+from inference.pool import INFERENCE, InferenceTimeout, risk_job
+
+router = APIRouter()
+log = logging.getLogger(__name__)
+
+INGEST_BATCH_ROWS = int(os.getenv("INGEST_BATCH_ROWS", "10000"))
+
+_batch_lock = asyncio.Lock()   # one batch between plan and apply at a time
+
+
+def _plan_batch(cols: dict, store):
+    with store.lock.read():
+        ok, rows, errors = validate(cols, store)
+        return ok, errors, plan(cols, ok, rows, store)
+
+
+async def _score(values: dict):
+    """(risk codes, scores) for planned rows: the model on the inference pool when trained."""
+    if risk.model_ready() and len(values["depth"]):
+        try:
+            results, _ = await INFERENCE.run(risk_job, risk.features(values))
+            return risk.from_results(results)
+        except InferenceTimeout:
+            log.warning("risk scoring timed out; scoring %d ingested rows by rule", len(values["depth"]))
+    return risk.rule_scores(values)
+
+
+def _apply_batch(cols: dict, planned: dict, codes, scores, store, views):
+    with store.lock.write():
+        return apply(cols, planned, codes, scores, store, views)
+
+
+async def _lines(request: Request):
+    """Yields batches of decoded, non-empty lines from the streamed body."""
+    tail, batch = b"", []
+    async for chunk in request.stream():
+        parts = (tail + chunk).split(b"\n")
+        tail = parts.pop()
+        batch.extend(p for p in parts if p.strip())
+        while len(batch) >= INGEST_BATCH_ROWS:
+            yield [p.decode("utf-8", "replace") for p in batch[:INGEST_BATCH_ROWS]]
+            batch = batch[INGEST_BATCH_ROWS:]
+    if tail.strip():
+        batch.append(tail)
+    if batch:
+        yield [p.decode("utf-8", "replace") for p in batch]
+
+
+@router.post("")
+async def ingest(request: Request):
+    is_csv = "csv" in request.headers.get("content-type", "")
+    store, views = get_store(), get_views()
+    started = time.perf_counter()
+    summary = {"batches": 0, "received": 0, "updated": 0, "created": 0, "rejected": 0, "errors": []}
+    header, line_no = None, 0
+
+    async for lines in _lines(request):
+        if is_csv and header is None:
+            header = [h.strip() for h in next(csv.reader(lines[:1]))]
+            lines, line_no = lines[1:], 1
+        if not lines:
+            continue
+        if is_csv:
+            cols, malformed = await run_in_threadpool(parse_csv, lines, header)
+        else:
+            cols, malformed = await run_in_threadpool(parse_ndjson, lines)
+
+        async with _batch_lock:
+            ok, errors, planned = await run_in_threadpool(_plan_batch, cols, store)
+            codes, scores = await _score(planned["values"])
+            result = await run_in_threadpool(_apply_batch, cols, planned, codes, scores, store, views)
+
+        summary["batches"]  += 1
+        summary["received"] += len(lines)
+        summary["updated"]  += result["updated"]
+        summary["created"]  += result["created"]
+        summary["rejected"] += len(malformed) + int((~ok).sum())
+        if len(summary["errors"]) < MAX_ERRORS:
+            # Malformed lines were dropped before column building, so record offsets skip them
+            skipped = set(malformed)
+            parsed  = [n for n in range(len(lines)) if n not in skipped] if malformed else None
+            summary["errors"].extend({"line": line_no + n + 1, "error": "malformed line"} for n in malformed)
+            summary["errors"].extend(
+                {"line": line_no + (parsed[i] if parsed else i) + 1, "error": reason} for i, reason in errors
+            )
+            summary["errors"] = summary["errors"][:MAX_ERRORS]
+        line_no += len(lines)
+
+    elapsed = time.perf_counter() - started
+    summary["data_version"] = store.version
+    summary["elapsed_s"]    = round(elapsed, 3)
+    summary["rows_per_s"]   = round(summary["received"] / elapsed) if elapsed > 0 else None
+    return summary
@@ -6,13 +6,35 @@ Person 1 owns this file.
 Endpoints:
   POST /api/simulator/run  — run simulation with given parameters
   GET  /api/simulator/presets — example intervention scenarios
+  POST /api/simulator/sweep — evaluate a grid of lever values, return the Pareto frontier (paginated)
+  POST /api/simulator/{state}/montecarlo — sampled depth bands and years-to-crisis for one state
 """
 
-from fastapi import APIRouter
-from models.schemas import SimulatorInput
+import os
+import json
+import time
+import asyncio
+import hashlib
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
+from models.schemas import SimulatorInput, SweepInput, MonteCarloInput
+from cache.redis_client import cache_get_or_set
+from db.seed import get_state
 
 router = APIRouter()
 
+SWEEP_MAX_COMBINATIONS = int(os.getenv("SWEEP_MAX_COMBINATIONS", "5000000"))
+SWEEP_TIME_BUDGET_MS   = float(os.getenv("SWEEP_TIME_BUDGET_MS", "3000"))
+MONTECARLO_CHUNK_TRIALS = int(os.getenv("MONTECARLO_CHUNK_TRIALS", "25000"))
+MONTECARLO_WORKERS      = int(os.getenv("MONTECARLO_WORKERS", str(os.cpu_count() or 1)))
+LEVERS = ("dams", "drip_pct", "rwh_units", "crop_diversification")
+RECOVERY_COEFFS = (0.09, 0.014, 0.004, 0.012)   # metres/year recovered per unit of each lever
+CRISIS_DEPTH_M  = 50                            # same threshold as forecast months_to_crisis
+BAND_PERCENTILES = (5, 25, 50, 75, 95)
+
 PRESETS = {
     "minimal": {"dams": 2,  "drip_pct": 15, "rwh_units": 50,  "crop_diversification": 10},
     "moderate": {"dams": 7,  "drip_pct": 45, "rwh_units": 200, "crop_diversification": 35},
@@ -20,12 +42,26 @@ PRESETS = {
 }
 
 
+# Effect formulas work on scalars and on broadcast NumPy arrays alike (see _sweep)
+def _recovery(dams, drip_pct, rwh_units, crop_div):
+    k_dams, k_drip, k_rwh, k_crop = RECOVERY_COEFFS
+    return dams * k_dams + drip_pct * k_drip + rwh_units * k_rwh + crop_div * k_crop
+
+
+def _farmers(dams, drip_pct, rwh_units, crop_div):
+    return (dams * 850 + drip_pct * 180 + rwh_units * 5 + crop_div * 120) / 1000
+
+
+def _score(dams, drip_pct, rwh_units, crop_div):
+    return dams * 5 + drip_pct * 0.5 + rwh_units * 0.1 + crop_div * 0.5
+
+
 def _compute(dams: int, drip_pct: int, rwh_units: int, crop_div: int) -> dict:
-    recovery   = round(dams * 0.09 + drip_pct * 0.014 + rwh_units * 0.004 + crop_div * 0.012, 2)
+    recovery   = round(_recovery(dams, drip_pct, rwh_units, crop_div), 2)
     delay_yrs  = round(dams * 0.45 + drip_pct * 0.07  + rwh_units * 0.018 + crop_div * 0.06)
-    farmers_k  = round((dams * 850 + drip_pct * 180 + rwh_units * 5 + crop_div * 120) / 1000)
+    farmers_k  = round(_farmers(dams, drip_pct, rwh_units, crop_div))
     extraction = min(round(drip_pct * 0.25 + rwh_units * 0.04 + crop_div * 0.18), 65)
-    score      = dams * 5 + drip_pct * 0.5 + rwh_units * 0.1 + crop_div * 0.5
+    score      = _score(dams, drip_pct, rwh_units, crop_div)
 
     if score > 150:
         verdict = "Strong intervention. Significant recovery projected. Recommend immediate policy adoption."
@@ -55,6 +91,255 @@ def run_simulation(params: SimulatorInput):
 @router.get("/presets")
 def get_presets():
     return {
-        name: {"inputs": p, "results": _compute(**p)}
+        name: {"inputs": p, "results": _compute(*(p[k] for k in LEVERS))}
         for name, p in PRESETS.items()
     }
+
+
+def _pareto_mask(cost: np.ndarray, a: np.ndarray, b: np.ndarray, deadline: float) -> np.ndarray:
+    """
+    True for points no other point beats: lower-or-equal cost with a >= and b >= (exact
+    duplicates keep one representative). Sorting by (cost asc, a desc, b desc) puts every
+    dominator before the point it dominates, so for each distinct value of b one running
+    maximum of a over the eligible prefix decides dominance for that whole level.
+    """
+    order = np.lexsort((-b, -a, cost))
+    a_s = a[order]
+    levels, b_code = np.unique(b[order], return_inverse=True)
+    dominated = np.zeros(len(order), dtype=bool)
+    for level in range(len(levels)):
+        if time.perf_counter() > deadline:
+            raise TimeoutError
+        here = b_code == level
+        prefix = np.maximum.accumulate(np.where(b_code >= level, a_s, -np.inf))
+        best_before = np.concatenate([[-np.inf], prefix[:-1]])
+        dominated[here] = best_before[here] >= a_s[here]
+    mask = np.zeros(len(order), dtype=bool)
+    mask[order[~dominated]] = True
+    return mask
+
+
+def _lever_values(spec, name: str) -> np.ndarray:
+    if spec.values is not None:
+        values = np.unique(np.asarray(spec.values, dtype=np.int64))
+    else:
+        values = np.arange(spec.min, spec.max + 1, spec.step, dtype=np.int64)
+    if len(values) == 0:
+        raise HTTPException(status_code=400, detail=f"{name}: empty range")
+    return values
+
+
+def _sweep(grids: list, time_budget_ms: float) -> dict:
+    """
+    Evaluates every combination in one broadcast pass and keeps the Pareto-optimal ones.
+
+    All three objectives are discrete for integer levers (cost in 0.1 steps, recovery
+    rounded to 0.01 m, farmers to whole thousands), so combinations first collapse to
+    the best recovery per (cost, farmers) cell; the frontier is then found over cells.
+    """
+    started  = time.perf_counter()
+    deadline = started + time_budget_ms / 1000
+    d, p, r, c = np.meshgrid(*grids, indexing="ij", sparse=True)
+
+    # Integer codes with the same rounding /run reports, so frontier points match single runs
+    cost10  = (50 * d + 5 * p + r + 5 * c).ravel()                 # 10 × intervention score, exact
+    rec100  = np.rint(_recovery(d, p, r, c) * 100).astype(np.int64).ravel()
+    farmers = np.rint(_farmers(d, p, r, c)).astype(np.int64).ravel()
+    if time.perf_counter() > deadline:
+        raise TimeoutError
+
+    f_min = int(farmers.min())
+    n_f   = int(farmers.max()) - f_min + 1
+    cell  = cost10 * n_f + (farmers - f_min)
+    if cell.size and cell.min() < 0:    # negative levers would make maximum.at index from the end
+        raise ValueError("sweep cell ids must be non-negative; lever values below 0 are not supported")
+    span  = int(cell.max()) + 1
+    ids   = None
+    if span > 4 * cell.size:    # sparse lever values: compact the cell ids first
+        ids, cell = np.unique(cell, return_inverse=True)
+        span = len(ids)
+    best = np.full(span, -1, dtype=np.int64)
+    np.maximum.at(best, cell, rec100)
+    cells = np.flatnonzero(best >= 0)
+    cell_cost, cell_farm = np.divmod(cells if ids is None else ids[cells], n_f)
+
+    keep  = _pareto_mask(cell_cost, best[cells], cell_farm, deadline)
+    front = cells[keep]
+
+    # One representative combination per frontier cell: the first that reaches its best recovery
+    lookup = np.full(len(best), False)
+    lookup[front] = True
+    hits  = np.flatnonzero(lookup[cell] & (rec100 == best[cell]))
+    _, first = np.unique(cell[hits], return_index=True)
+    chosen = hits[first]
+    chosen = chosen[np.lexsort((-rec100[chosen], cost10[chosen]))]
+    idx    = np.unravel_index(chosen, tuple(len(g) for g in grids))
+    inputs = [g[i] for g, i in zip(grids, idx)]
+
+    return {
+        "combinations": int(cost10.size),
+        "elapsed_ms":   round((time.perf_counter() - started) * 1000, 1),
+        "frontier": [
+            {
+                "inputs": dict(zip(LEVERS, combo)),
+                "annual_recovery_m":           rec / 100,
+                "farmers_benefited_thousands": fk,
+                "cost_proxy":                  cst / 10,
+            }
+            for *combo, rec, fk, cst in zip(*(x.tolist() for x in inputs),
+                                            rec100[chosen].tolist(),
+                                            farmers[chosen].tolist(),
+                                            cost10[chosen].tolist())
+        ],
+    }
+
+
+@router.post("/sweep")
+async def run_sweep(params: SweepInput):
+    """
+    Pareto frontier over every lever combination: maximise recovery and farmers
+    benefited, minimise cost_proxy (the intervention score). Sorted by cost; paginated.
+    Pages of the same sweep are served from cache.
+    """
+    grids = [_lever_values(getattr(params, name), name) for name in LEVERS]
+    total = int(np.prod([len(g) for g in grids]))
+    if total > SWEEP_MAX_COMBINATIONS:
+        raise HTTPException(status_code=400, detail=f"{total} combinations exceeds the limit of {SWEEP_MAX_COMBINATIONS}")
+
+    budget = min(params.time_budget_ms or SWEEP_TIME_BUDGET_MS, SWEEP_TIME_BUDGET_MS)
+    spec   = json.dumps([g.tolist() for g in grids]).encode()
+    key    = "sweep:" + hashlib.sha1(spec).hexdigest()
+
+    def compute():
+        try:
+            return _sweep(grids, budget)
+        except TimeoutError:
+            raise HTTPException(status_code=503, detail=f"Sweep exceeded its {budget:.0f} ms budget — narrow the ranges")
+
+    result = await cache_get_or_set(key, compute, ttl=600)
+    start  = (params.page - 1) * params.page_size
+    return {
+        "combinations":  result["combinations"],
+        "frontier_size": len(result["frontier"]),
+        "elapsed_ms":    result["elapsed_ms"],
+        "page":          params.page,
+        "page_size":     params.page_size,
+        "results":       result["frontier"][start:start + params.page_size],
+    }
+
+
+# ── Monte Carlo ───────────────────────────────────────────────────────
+
+_pool = None
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    # Spawned, not forked: the API process runs threads, and a fork taken while
+    # one of them holds a lock leaves that lock held forever in the child
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=MONTECARLO_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _simulate_chunk(seed, n: int, years: int, depth: float, dep: float,
+                    levers: tuple, rainfall_cv: float, coeff_cv: float):
+    """
+    n trajectories as one (n, years) array. Each trial draws its own lever effects;
+    each trial-year draws a rainfall factor (lognormal, mean 1). Wet years slow
+    depletion and boost rain-fed recharge (dams, RWH); drip and crop changes cut
+    demand regardless of rain. Returns (depth paths, fractional years to crisis | NaN).
+    """
+    rng = np.random.default_rng(seed)
+    effect = np.asarray(RECOVERY_COEFFS) * np.asarray(levers)
+    effect = effect * np.clip(1 + coeff_cv * rng.standard_normal((n, 4)), 0, None)
+
+    sigma = np.sqrt(np.log1p(rainfall_cv ** 2))
+    rain  = rng.lognormal(-sigma ** 2 / 2, sigma, (n, years))
+
+    rain_fed = (effect[:, 0] + effect[:, 2])[:, None]
+    demand   = (effect[:, 1] + effect[:, 3])[:, None]
+    delta = dep * (2 - rain) - rain_fed * rain - demand
+    paths = np.clip(depth + np.cumsum(delta, axis=1), 0, None)
+
+    if depth >= CRISIS_DEPTH_M:
+        to_crisis = np.zeros(n)
+    else:
+        crossed = paths >= CRISIS_DEPTH_M
+        first = crossed.argmax(axis=1)
+        rows  = np.arange(n)
+        prev  = np.where(first == 0, depth, paths[rows, first - 1])
+        cur   = paths[rows, first]
+        to_crisis = np.where(crossed.any(axis=1), first + (CRISIS_DEPTH_M - prev) / (cur - prev), np.nan)
+    return paths.astype(np.float32), to_crisis.astype(np.float32)
+
+
+def _summarise(paths: np.ndarray, to_crisis: np.ndarray, years: int) -> dict:
+    bands = np.percentile(paths, BAND_PERCENTILES, axis=0)
+    hit = to_crisis[~np.isnan(to_crisis)]
+    counts = np.bincount(np.floor(hit).astype(np.int64), minlength=years)[:years] if len(hit) else np.zeros(years, dtype=np.int64)
+    quantiles = np.percentile(hit, BAND_PERCENTILES) if len(hit) else [None] * len(BAND_PERCENTILES)
+    return {
+        "depth_bands": [
+            {"year": y + 1, **{f"p{q}": round(float(v), 2) for q, v in zip(BAND_PERCENTILES, bands[:, y])}}
+            for y in range(years)
+        ],
+        "years_to_crisis": {
+            "probability_within_horizon": round(len(hit) / len(to_crisis), 4),
+            **{f"p{q}": (round(float(v), 2) if v is not None else None) for q, v in zip(BAND_PERCENTILES, quantiles)},
+            "histogram": [{"year": y + 1, "probability": round(c / len(to_crisis), 4)} for y, c in enumerate(counts.tolist())],
+        },
+    }
+
+
+@router.post("/{state_name}/montecarlo")
+async def run_montecarlo(state_name: str, params: MonteCarloInput):
+    """
+    Samples lever effects and rainfall over `trials` trajectories starting from the
+    state's current depth and depletion. Trials run in fixed-size chunks with their own
+    seeds, so a given seed gives the same result whether chunks run inline or in the pool.
+    """
+    data = get_state(state_name)
+    if not data:
+        raise HTTPException(status_code=404, detail=f"State '{state_name}' not found")
+
+    started = time.perf_counter()
+    levers  = tuple(getattr(params, name) for name in LEVERS)
+    sizes   = [MONTECARLO_CHUNK_TRIALS] * (params.trials // MONTECARLO_CHUNK_TRIALS)
+    if params.trials % MONTECARLO_CHUNK_TRIALS:
+        sizes.append(params.trials % MONTECARLO_CHUNK_TRIALS)
+    seeds = np.random.SeedSequence(params.seed).spawn(len(sizes))
+    args  = (params.years, data["depth"], data["dep"], levers, params.rainfall_cv, params.coeff_cv)
+
+    if len(sizes) == 1:
+        chunks = [await run_in_threadpool(_simulate_chunk, seeds[0], sizes[0], *args)]
+    else:
+        loop   = asyncio.get_running_loop()
+        pool   = _process_pool()
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(pool, _simulate_chunk, seed, n, *args) for seed, n in zip(seeds, sizes)
+        ))
+
+    paths     = np.concatenate([c[0] for c in chunks])
+    to_crisis = np.concatenate([c[1] for c in chunks])
+    summary   = await run_in_threadpool(_summarise, paths, to_crisis, params.years)
+    return {
+        "state":              state_name,
+        "inputs":             params.dict(),
+        "current_depth_m":    data["depth"],
+        "annual_depletion_m": data["dep"],
+        "crisis_depth_m":     CRISIS_DEPTH_M,
+        "chunks":             len(sizes),
+        "elapsed_ms":         round((time.perf_counter() - started) * 1000, 1),
+        **summary,
+    }
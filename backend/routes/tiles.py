@@ -0,0 +1,100 @@
+"""
+AquaSentinel — Map Tile Routes
+Person 1 owns this file.
+Endpoints:
+  GET /api/tiles/{z}/{x}/{y} — pre-aggregated XYZ map tile: state / district aggregates at low
+                               zoom, individual readings from TILE_WELL_ZOOM (see db/tiles.py)
+  GET /api/tiles/status      — tile cache size and hit / miss / invalidation counts
+
+Built tiles are kept on disk (cache/disk_lru.py), up to TILE_CACHE_MAX_MB with the least
+recently used evicted first. They are not tied to the data version: when ingestion
+refreshes rows, only the cached tiles those rows touch are dropped, and each is rebuilt
+on its next request.
+"""
+
+import os
+import tempfile
+import threading
+import numpy as np
+from fastapi import APIRouter, HTTPException, Path
+from starlette.concurrency import run_in_threadpool
+from db.seed import get_store, get_views
+from db.tiles import build_tile, tiles_touched, MAX_ZOOM, TILE_DISTRICT_ZOOM, TILE_WELL_ZOOM
+from cache.disk_lru import DiskLRU
+from cache.response import dumps, json_response
+
+router = APIRouter()
+
+TILE_CACHE_DIR    = os.getenv("TILE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "aquasentinel-tiles"))
+TILE_CACHE_MAX_MB = float(os.getenv("TILE_CACHE_MAX_MB", "256"))
+
+_disk = DiskLRU(os.path.join(TILE_CACHE_DIR, f"worker-{os.getpid()}"), int(TILE_CACHE_MAX_MB * 2 ** 20))
+_lock = threading.Lock()      # orders tile writes against invalidations
+_seen = {"epoch": 0, "lat": get_store()["lat"].copy(), "lng": get_store()["lng"].copy()}
+
+
+def _tile_key(z: int, x: int, y: int) -> str:
+    return f"{z}/{x}/{y}.json"
+
+
+def _invalidate(rows: np.ndarray):
+    """
+    Drops the cached tiles, at every cached zoom, whose content the refreshed rows change.
+    Runs inside views.refresh(), so under the store's write lock already.
+    """
+    store = get_store()
+    # Where the rows were when the cached tiles were built (NaN for rows new since then)
+    known   = rows < len(_seen["lat"])
+    old_lat = np.full(len(rows), np.nan)
+    old_lng = np.full(len(rows), np.nan)
+    old_lat[known] = _seen["lat"][rows[known]]
+    old_lng[known] = _seen["lng"][rows[known]]
+
+    zooms = {int(key.split("/", 1)[0]) for key in _disk.keys()}
+    stale = [_tile_key(z, x, y) for z in zooms for x, y in tiles_touched(store, rows, z, old_lat, old_lng)]
+    with _lock:
+        _seen.update(epoch=_seen["epoch"] + 1, lat=store["lat"].copy(), lng=store["lng"].copy())
+        _disk.delete(stale)
+
+
+get_views().watch(_invalidate)
+
+
+def _render(z: int, x: int, y: int) -> bytes:
+    store = get_store()
+    with store.lock.read():
+        epoch = _seen["epoch"]
+        tile  = build_tile(store, z, x, y)
+    body = dumps(tile)
+    with _lock:
+        if _seen["epoch"] == epoch:      # data changed while building: serve it, don't cache it
+            _disk.put(_tile_key(z, x, y), body)
+    return body
+
+
+def close_tiles():
+    _disk.close()
+
+
+@router.get("/status")
+def get_tile_status():
+    return {
+        "district_zoom": TILE_DISTRICT_ZOOM,
+        "well_zoom":     TILE_WELL_ZOOM,
+        "max_zoom":      MAX_ZOOM,
+        "cache":         _disk.status(),
+    }
+
+
+@router.get("/{z}/{x}/{y}")
+async def get_tile(
+    z: int = Path(..., ge=0, le=MAX_ZOOM),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+):
+    if x >= 2 ** z or y >= 2 ** z:
+        raise HTTPException(status_code=404, detail=f"Tile {z}/{x}/{y} does not exist")
+    body = await run_in_threadpool(_disk.get, _tile_key(z, x, y))
+    if body is None:
+        body = await run_in_threadpool(_render, z, x, y)
+    return json_response(body)
@@ -1,11 +1,11 @@
 /**
  * AquaSentinel — Live Alerts Ticker
  * Person 3 owns this file.
- * Scrolling marquee of active groundwater alerts fetched from API.
+ * Scrolling marquee of active groundwater alerts, kept live over the alert stream.
  */
 
 import { useEffect, useState } from "react";
-import { getActiveAlerts } from "../services/api";
+import { getActiveAlerts, subscribeAlerts } from "../services/api";
 
 const RISK_COLOR = { critical: "#ff2d55", high: "#ff6b35", moderate: "#ffcc00", low: "#00ff9d" };
 
@@ -25,6 +25,8 @@ export default function AlertsTicker() {
           { state: "Gujarat (Saurashtra)",risk_level:"critical", depth_m: 45, depletion_m_per_year: 7.8, contamination_alerts: [] },
         ]);
       });
+    // Server pushes diffs from here on — no polling
+    return subscribeAlerts(setAlerts);
   }, []);
 
   const items = [...alerts, ...alerts]; // duplicate for seamless loop
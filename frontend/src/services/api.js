@@ -6,6 +6,7 @@
  */
 
 import axios from "axios";
+import { decode } from "@msgpack/msgpack";
 
 const BASE_URL = import.meta.env.VITE_API_URL || "http://localhost:8000";
 
@@ -20,14 +21,104 @@ export const getAllReadings  = ()      => api.get("/api/groundwater/all");
 export const getNationalStats = ()    => api.get("/api/groundwater/stats");
 export const getStateData   = (state) => api.get(`/api/groundwater/${encodeURIComponent(state)}`);
 export const getByRisk      = (level) => api.get(`/api/groundwater/risk/${level}`);
+export const getInViewport  = ({ minLat, minLng, maxLat, maxLng }) =>
+  api.get("/api/groundwater/bbox", { params: { min_lat: minLat, min_lng: minLng, max_lat: maxLat, max_lng: maxLng } });
+export const getHistory     = (state, from, to) =>
+  api.get(`/api/groundwater/${encodeURIComponent(state)}/history`, { params: { from, to } });
+export const getNearest     = (lat, lng, k = 10) => api.get("/api/groundwater/near", { params: { lat, lng, k } });
+
+// ── Columnar binary responses ─────────────────────────────────────────
+// /all, /risk/{level} and history also answer as MessagePack column arrays (backend/formats/columnar.py).
+// res.data is { length, columns: { name: Float64Array | Int8Array | ... | Array }, ...other fields }:
+// numeric columns are typed arrays over the response bytes (little-endian, as on every browser
+// platform), strings are plain arrays with null for missing values, NaN marks a history gap.
+const TYPED_ARRAYS = {
+  float64: Float64Array, float32: Float32Array,
+  int8: Int8Array, int16: Int16Array, int32: Int32Array,
+  uint8: Uint8Array, uint16: Uint16Array, uint32: Uint32Array,
+};
+
+const decodeColumn = (column) => {
+  if (column.type === "dictionary") {
+    const codes = decodeColumn(column.codes);
+    return Array.from(codes, (code) => column.values[code]);
+  }
+  if (column.type === "string") return column.data;
+  const Typed = TYPED_ARRAYS[column.type];
+  // A typed array view needs an aligned offset; copy the bytes only when they are not
+  const bytes = column.data.byteOffset % Typed.BYTES_PER_ELEMENT ? column.data.slice() : column.data;
+  return new Typed(bytes.buffer, bytes.byteOffset, bytes.byteLength / Typed.BYTES_PER_ELEMENT);
+};
+
+export const decodeColumnar = (buffer) => {
+  const { columns, ...fields } = decode(new Uint8Array(buffer));
+  return {
+    ...fields,
+    columns: Object.fromEntries(Object.entries(columns).map(([name, col]) => [name, decodeColumn(col)])),
+  };
+};
+
+// Row objects in the JSON shape (null fields left out), for components that want them
+export const columnarRows = ({ length, columns }) => {
+  const entries = Object.entries(columns);
+  return Array.from({ length }, (_, i) => {
+    const row = {};
+    for (const [name, values] of entries) if (values[i] != null) row[name] = values[i];
+    return row;
+  });
+};
+
+const getColumnar = (url, config = {}) =>
+  api.get(url, { ...config, responseType: "arraybuffer", headers: { Accept: "application/x-msgpack" } })
+    .then((res) => ({ ...res, data: decodeColumnar(res.data) }));
+
+export const getAllReadingsColumnar = ()      => getColumnar("/api/groundwater/all");
+export const getByRiskColumnar      = (level) => getColumnar(`/api/groundwater/risk/${level}`);
+export const getHistoryColumnar     = (state, from, to) =>
+  getColumnar(`/api/groundwater/${encodeURIComponent(state)}/history`, { params: { from, to } });
+
+// ── Map tiles ─────────────────────────────────────────────────────────
+// XYZ tiles: state / district aggregates at low zoom, individual readings when zoomed in
+export const TILE_URL = `${BASE_URL}/api/tiles/{z}/{x}/{y}`;
+export const getTile  = (z, x, y) => api.get(`/api/tiles/${z}/${x}/${y}`);
 
 // ── Alerts ────────────────────────────────────────────────────────────
 export const getActiveAlerts        = () => api.get("/api/alerts/active");
 export const getContaminationAlerts = () => api.get("/api/alerts/contamination");
 
+// Live alert stream (Server-Sent Events): one snapshot, then only diffs.
+// onChange receives the full, updated alert list each time. Returns an unsubscribe function.
+export const subscribeAlerts = (onChange, onError) => {
+  const source = new EventSource(`${BASE_URL}/api/alerts/stream`);
+  let alerts = [];
+  const keyOf = (a) => a.id || a.state;
+
+  source.addEventListener("snapshot", (e) => {
+    alerts = JSON.parse(e.data).alerts;
+    onChange(alerts);
+  });
+  source.addEventListener("diff", (e) => {
+    const byKey = new Map(alerts.map((a) => [keyOf(a), a]));
+    for (const c of JSON.parse(e.data).changes) {
+      if (c.change === "cleared") byKey.delete(c.key);
+      else byKey.set(c.key, c.alert);
+    }
+    // Same order as /api/alerts/active: critical first, then by score
+    alerts = [...byKey.values()].sort((a, b) =>
+      (a.risk_level !== "critical") - (b.risk_level !== "critical") || b.risk_score - a.risk_score);
+    onChange(alerts);
+  });
+  if (onError) source.onerror = onError;
+  return () => source.close();
+};
+
 // ── Forecast (ML models) ──────────────────────────────────────────────
-export const getStateForecast       = (state) => api.get(`/api/forecast/${encodeURIComponent(state)}`);
+export const getStateForecast       = (state, months = 6) => api.get(`/api/forecast/${encodeURIComponent(state)}`, { params: { months } });
+export const getAllForecasts        = (months = 6)        => api.get("/api/forecast/all", { params: { months } });
+export const getForecastStatus      = ()      => api.get("/api/forecast/status");
+export const getBatchForecast       = (states, months = 6) => api.post("/api/forecast/batch", { states, months });
 export const getContaminationRisk   = (state) => api.get(`/api/forecast/contamination/${encodeURIComponent(state)}`);
+export const getAllContaminationRisk = ()     => api.get("/api/forecast/contamination/all");
 
 // ── Policy Simulator ──────────────────────────────────────────────────
 export const runSimulator = (params) =>
@@ -35,4 +126,11 @@ export const runSimulator = (params) =>
 
 export const getSimulatorPresets = () => api.get("/api/simulator/presets");
 
+// grids: { dams: {min, max, step} | {values}, ... }, plus page / page_size
+export const runSweep = (grids) => api.post("/api/simulator/sweep", grids);
+
+// params: levers plus { trials, years, rainfall_cv, coeff_cv, seed }
+export const runMonteCarlo = (state, params) =>
+  api.post(`/api/simulator/${encodeURIComponent(state)}/montecarlo`, params);
+
 export default api;
@@ -4,101 +4,215 @@ Person 2 owns this file.
 Run this FIRST before training either model.
 Generates realistic synthetic groundwater time-series + contamination data.
 
-Run: python generate_mock.py
+Run: python generate_mock.py                          # 23 states, 3000 records (demo size)
+     python generate_mock.py --districts 700 --wells 200000 --records 20000000
+     python generate_mock.py --format parquet --shard-rows 2000000
+
+Output (next to this file), read by both train.py scripts:
+  depletion_series/        — shards of (entity, month, depth_m) + entities.npz (name, level, parent)
+  contamination_records/   — shards of the XGBoost features + risk label
+  *.csv                    — the same data as single CSVs, only while it is small (<= --csv-max-rows);
+                             backend/db/timeseries.py reads depletion_series.csv
+
+Generation is vectorized per shard: a whole block of entities × months (or records)
+is one array expression, so tens of millions of rows take seconds, not hours.
 """
 
+import argparse
+import os
+import sys
+import time
 import numpy as np
 import pandas as pd
-import os
 
-np.random.seed(42)
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from data.shards import ShardWriter, read_columns
+
 OUT = os.path.join(os.path.dirname(__file__))
+DEPLETION_DIR     = os.path.join(OUT, "depletion_series")
+CONTAMINATION_DIR = os.path.join(OUT, "contamination_records")
+SHARD_ROWS   = 5_000_000
+CSV_MAX_ROWS = 1_000_000
+LEVELS       = ("state", "district", "well")   # entities.npz `level` codes 0, 1, 2
+
+# (state, base depth m, depletion m/month, seasonal amplitude m)
+STATE_PARAMS = [
+    ("Rajasthan", 30, 0.68, 2.0),
+    ("Delhi", 28, 0.61, 1.5),
+    ("Gujarat", 26, 0.65, 1.8),
+    ("Andhra Pradesh", 22, 0.57, 2.5),
+    ("Tamil Nadu", 20, 0.52, 2.2),
+    ("Punjab", 18, 0.48, 1.8),
+    ("Haryana", 16, 0.43, 1.5),
+    ("Uttar Pradesh", 18, 0.41, 1.6),
+    ("Madhya Pradesh", 14, 0.39, 1.3),
+    ("Maharashtra", 12, 0.35, 1.4),
+    ("Karnataka", 14, 0.37, 1.5),
+    ("Bihar", 12, 0.36, 1.2),
+    ("West Bengal", 8, 0.27, 1.0),
+    ("Odisha", 6, 0.22, 1.1),
+    ("Jharkhand", 7, 0.23, 1.0),
+    ("Chhattisgarh", 5, 0.20, 0.9),
+    ("Uttarakhand", 6, 0.24, 1.2),
+    ("Assam", 4, 0.15, 0.8),
+    ("Kerala", 5, 0.17, 1.0),
+    ("Himachal Pradesh", 3, 0.12, 0.6),
+    ("Jammu & Kashmir", 5, 0.17, 0.8),
+    ("Goa", 3, 0.10, 0.7),
+    ("Sikkim", 2, 0.04, 0.4),
+]
+
+# feature: (low, high) of the uniform draw
+FEATURE_RANGES = {
+    "depth_m":         (5,   60),
+    "extraction_rate": (0.5, 10),
+    "geology_score":   (0,   1),
+    "rainfall_mm":     (200, 2000),
+    "fluoride_hist":   (0,   12),
+    "arsenic_hist":    (0,   0.5),
+    "iron_hist":       (0,   6),
+}
+RISK_EDGES = [16, 32, 55]   # score > 55 critical, > 32 high, > 16 moderate, else low
+
+
+def _entities(n_districts: int, n_wells: int, rng) -> dict:
+    """
+    States, then districts (each under a random state), then wells (each under a random
+    district, or state if there are none). Children inherit their parent's base depth,
+    depletion rate and seasonal amplitude with ±30% (districts) / ±20% (wells) jitter.
+    """
+    n_states = len(STATE_PARAMS)
+    params = np.array([p[1:] for p in STATE_PARAMS], dtype=np.float64)
+    parent = np.full(n_states, -1, dtype=np.int32)
+
+    d_parent = rng.integers(0, n_states, n_districts).astype(np.int32)
+    d_params = params[d_parent] * rng.uniform(0.7, 1.3, (n_districts, 3))
+    pool_lo, pool_n = (n_states, n_districts) if n_districts else (0, n_states)
+    w_parent = (pool_lo + rng.integers(0, pool_n, n_wells)).astype(np.int32)
+    all_params = np.concatenate([params, d_params])
+    w_params = all_params[w_parent] * rng.uniform(0.8, 1.2, (n_wells, 3))
 
+    names = np.concatenate([
+        np.array([p[0] for p in STATE_PARAMS]),
+        np.array([f"DIST-{i:05d}" for i in range(n_districts)], dtype=str),
+        np.array([f"WELL-{i:08d}" for i in range(n_wells)], dtype=str),
+    ])
+    return {
+        "name":   names,
+        "level":  np.repeat(np.arange(3, dtype=np.int8), [n_states, n_districts, n_wells]),
+        "parent": np.concatenate([parent, d_parent, w_parent]),
+        "params": np.concatenate([all_params, w_params]),
+    }
 
-def generate_depletion_series(n_states=23, n_months=120):
+
+def generate_depletion_series(n_districts=0, n_wells=0, n_months=120, shard_rows=SHARD_ROWS,
+                              fmt="npy", seed=42, csv_max_rows=CSV_MAX_ROWS):
     """
-    120 months (10 years) of monthly groundwater depth readings per state.
-    Each state has a unique base depth, depletion rate, and seasonal amplitude.
+    n_months of monthly groundwater depth readings per entity (states, districts, wells).
+    Each entity has its own base depth, depletion rate, and seasonal amplitude.
     """
-    rows = []
-    state_params = [
-        ("Rajasthan", 30, 0.68, 2.0),
-        ("Delhi", 28, 0.61, 1.5),
-        ("Gujarat", 26, 0.65, 1.8),
-        ("Andhra Pradesh", 22, 0.57, 2.5),
-        ("Tamil Nadu", 20, 0.52, 2.2),
-        ("Punjab", 18, 0.48, 1.8),
-        ("Haryana", 16, 0.43, 1.5),
-        ("Uttar Pradesh", 18, 0.41, 1.6),
-        ("Madhya Pradesh", 14, 0.39, 1.3),
-        ("Maharashtra", 12, 0.35, 1.4),
-        ("Karnataka", 14, 0.37, 1.5),
-        ("Bihar", 12, 0.36, 1.2),
-        ("West Bengal", 8, 0.27, 1.0),
-        ("Odisha", 6, 0.22, 1.1),
-        ("Jharkhand", 7, 0.23, 1.0),
-        ("Chhattisgarh", 5, 0.20, 0.9),
-        ("Uttarakhand", 6, 0.24, 1.2),
-        ("Assam", 4, 0.15, 0.8),
-        ("Kerala", 5, 0.17, 1.0),
-        ("Himachal Pradesh", 3, 0.12, 0.6),
-        ("Jammu & Kashmir", 5, 0.17, 0.8),
-        ("Goa", 3, 0.10, 0.7),
-        ("Sikkim", 2, 0.04, 0.4),
-    ]
-
-    for state, base, rate, amp in state_params:
-        for t in range(n_months):
-            seasonal = amp * np.sin(2 * np.pi * t / 12)
-            noise    = np.random.normal(0, 0.3)
-            depth    = base + rate * t + seasonal + noise
-            rows.append({"state": state, "month": t, "depth_m": round(depth, 3)})
-
-    df = pd.DataFrame(rows)
+    started  = time.perf_counter()
+    seeds    = np.random.SeedSequence(seed).spawn(2)
+    entities = _entities(n_districts, n_wells, np.random.default_rng(seeds[0]))
+    n_entities = len(entities["name"])
+    per_shard  = max(1, shard_rows // n_months)
+    n_shards   = -(-n_entities // per_shard)
+
+    t        = np.arange(n_months)
+    seasonal = np.sin(2 * np.pi * t / 12)
+    writer   = ShardWriter(DEPLETION_DIR, fmt)
+    for lo, shard_seed in zip(range(0, n_entities, per_shard), seeds[1].spawn(n_shards)):
+        hi  = min(lo + per_shard, n_entities)
+        rng = np.random.default_rng(shard_seed)
+        base, rate, amp = entities["params"][lo:hi].T
+        depth = (base[:, None] + rate[:, None] * t + amp[:, None] * seasonal
+                 + rng.normal(0, 0.3, (hi - lo, n_months)))
+        writer.write({
+            "entity":  np.repeat(np.arange(lo, hi, dtype=np.int32), n_months),
+            "month":   np.tile(t.astype(np.int16), hi - lo),
+            "depth_m": depth.astype(np.float32).ravel(),
+        })
+    writer.write_entities(name=entities["name"], level=entities["level"], parent=entities["parent"])
+    manifest = writer.close()
+    print(f"Saved depletion series: {DEPLETION_DIR} ({manifest['rows']} rows, {n_entities} entities, "
+          f"{len(manifest['shards'])} {fmt} shards, {time.perf_counter() - started:.1f}s)")
+
+    if manifest["rows"] <= csv_max_rows:
+        _depletion_csv(entities["name"])
+
+
+def _depletion_csv(names):
+    cols = read_columns(DEPLETION_DIR)
+    df = pd.DataFrame({
+        "state":   names[cols["entity"]],
+        "month":   cols["month"],
+        "depth_m": np.round(cols["depth_m"].astype(np.float64), 3),
+    })
     out_path = os.path.join(OUT, "depletion_series.csv")
     df.to_csv(out_path, index=False)
     print(f"Saved depletion series: {out_path} ({len(df)} rows)")
-    return df
 
 
-def generate_contamination_records(n=3000):
+def label_risk(df) -> np.ndarray:
+    """Risk class (0=low … 3=critical) from the contamination score, for whole columns at once."""
+    score = (df["depth_m"] * 0.30 +
+             df["extraction_rate"] * 5 +
+             df["fluoride_hist"] * 8 +
+             df["arsenic_hist"] * 60)
+    return np.digitize(score, RISK_EDGES, right=True).astype(np.int8)
+
+
+def generate_contamination_records(n=3000, shard_rows=SHARD_ROWS, fmt="npy", seed=42,
+                                   csv_max_rows=CSV_MAX_ROWS):
     """
     Tabular records for XGBoost contamination risk classification.
     Features: depth, extraction_rate, geology_score, rainfall, fluoride_hist, arsenic_hist, iron_hist
     Label: risk (0=low, 1=moderate, 2=high, 3=critical)
     """
-    df = pd.DataFrame({
-        "depth_m":           np.random.uniform(5,  60,   n),
-        "extraction_rate":   np.random.uniform(0.5, 10,  n),
-        "geology_score":     np.random.uniform(0,   1,   n),
-        "rainfall_mm":       np.random.uniform(200, 2000, n),
-        "fluoride_hist":     np.random.uniform(0,   12,  n),
-        "arsenic_hist":      np.random.uniform(0,   0.5, n),
-        "iron_hist":         np.random.uniform(0,   6,   n),
-    })
+    started  = time.perf_counter()
+    n_shards = max(1, -(-n // shard_rows))
+    writer   = ShardWriter(CONTAMINATION_DIR, fmt)
+    counts   = np.zeros(4, dtype=np.int64)
+    seeds    = np.random.SeedSequence([seed, 1]).spawn(n_shards)
+    for lo, shard_seed in zip(range(0, max(n, 1), shard_rows), seeds):
+        size = min(shard_rows, n - lo)
+        rng  = np.random.default_rng(shard_seed)
+        cols = {f: rng.uniform(a, b, size).astype(np.float32) for f, (a, b) in FEATURE_RANGES.items()}
+        cols["risk"] = label_risk(cols)
+        counts += np.bincount(cols["risk"], minlength=4)
+        writer.write(cols)
+    manifest = writer.close()
+    print(f"Saved contamination records: {CONTAMINATION_DIR} ({manifest['rows']} rows, "
+          f"{len(manifest['shards'])} {fmt} shards, {time.perf_counter() - started:.1f}s)")
+    print("Class distribution:\n" + "\n".join(f"  {k}: {c}" for k, c in enumerate(counts)))
 
-    def label(row):
-        score = (row.depth_m * 0.30 +
-                 row.extraction_rate * 5 +
-                 row.fluoride_hist * 8 +
-                 row.arsenic_hist * 60)
-        if score > 55:  return 3   # critical
-        if score > 32:  return 2   # high
-        if score > 16:  return 1   # moderate
-        return 0                   # low
+    if n <= csv_max_rows:
+        df = pd.DataFrame(read_columns(CONTAMINATION_DIR))
+        out_path = os.path.join(OUT, "contamination_records.csv")
+        df.to_csv(out_path, index=False)
+        print(f"Saved contamination records: {out_path} ({len(df)} rows)")
 
-    df["risk"] = df.apply(label, axis=1)
 
-    out_path = os.path.join(OUT, "contamination_records.csv")
-    df.to_csv(out_path, index=False)
-    print(f"Saved contamination records: {out_path} ({len(df)} rows)")
-    print(f"Class distribution:\n{df['risk'].value_counts().sort_index()}")
-    return df
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic AquaSentinel training data")
+    parser.add_argument("--districts",  type=int, default=0,    help="district-level series (besides the 23 states)")
+    parser.add_argument("--wells",      type=int, default=0,    help="well-level series")
+    parser.add_argument("--months",     type=int, default=120,  help="months per series")
+    parser.add_argument("--records",    type=int, default=3000, help="contamination records")
+    parser.add_argument("--shard-rows", type=int, default=SHARD_ROWS)
+    parser.add_argument("--format",     choices=("npy", "parquet"), default="npy")
+    parser.add_argument("--seed",       type=int, default=42)
+    parser.add_argument("--csv-max-rows", type=int, default=CSV_MAX_ROWS,
+                        help="also write single CSVs for datasets up to this many rows (0 = never)")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    generate_depletion_series()
-    generate_contamination_records()
+    args = parse_args()
+    generate_depletion_series(args.districts, args.wells, args.months, args.shard_rows,
+                              args.format, args.seed, args.csv_max_rows)
+    generate_contamination_records(args.records, args.shard_rows, args.format, args.seed,
+                                   args.csv_max_rows)
     print("\nAll training data generated. Now run:")
     print("  python ../lstm/train.py")
-    print("  python ../xgboost_model/train.py")
+    print("  python ../xgboost/train.py")
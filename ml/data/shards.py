@@ -0,0 +1,121 @@
+"""
+AquaSentinel — Chunked Columnar Dataset Format
+Person 2 owns this file.
+Written by generate_mock.py, read by lstm/train.py and xgboost/train.py.
+
+Layout of a dataset directory:
+  manifest.json           — format, column dtypes, shard names and row counts
+  entities.npz            — optional entity table (name, level, parent) for entity-keyed rows
+  part-00000.<col>.npy    — one file per column per shard   (format "npy")
+  part-00000.parquet      — one file per shard              (format "parquet", needs pyarrow)
+
+npy shards can be memory-mapped, so reading a column never copies more than is used.
+"""
+
+import json
+import os
+import numpy as np
+
+MANIFEST = "manifest.json"
+ENTITIES = "entities.npz"
+FORMATS  = ("npy", "parquet")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise SystemExit("Parquet shards need pyarrow: pip install pyarrow (or use --format npy)")
+
+
+def is_dataset(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, MANIFEST))
+
+
+class ShardWriter:
+    """Appends column chunks as shards; close() writes the manifest that makes them readable."""
+
+    def __init__(self, path: str, fmt: str = "npy"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown shard format {fmt!r} (expected one of {FORMATS})")
+        self.path, self.fmt = path, fmt
+        self.shards, self.dtypes = [], None
+        os.makedirs(path, exist_ok=True)
+        # Drop the previous dataset first; it stays unreadable until the new manifest lands
+        for name in os.listdir(path):
+            if name == MANIFEST or name == ENTITIES or name.startswith("part-"):
+                os.remove(os.path.join(path, name))
+
+    def write(self, columns: dict):
+        name = f"part-{len(self.shards):05d}"
+        rows = len(next(iter(columns.values())))
+        if self.dtypes is None:
+            self.dtypes = {c: np.asarray(v).dtype.str for c, v in columns.items()}
+        if self.fmt == "npy":
+            for col, values in columns.items():
+                np.save(os.path.join(self.path, f"{name}.{col}.npy"), np.ascontiguousarray(values))
+        else:
+            pa = _pyarrow()
+            table = pa.table({col: np.asarray(values) for col, values in columns.items()})
+            pa.parquet.write_table(table, os.path.join(self.path, f"{name}.parquet"))
+        self.shards.append({"name": name, "rows": int(rows)})
+
+    def write_entities(self, **arrays):
+        np.savez(os.path.join(self.path, ENTITIES), **arrays)
+
+    def close(self) -> dict:
+        manifest = {
+            "format":  self.fmt,
+            "columns": self.dtypes or {},
+            "rows":    sum(s["rows"] for s in self.shards),
+            "shards":  self.shards,
+        }
+        with open(os.path.join(self.path, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+def read_manifest(path: str) -> dict:
+    with open(os.path.join(path, MANIFEST)) as f:
+        return json.load(f)
+
+
+def read_shard(path: str, manifest: dict, shard: dict, columns: list = None, mmap: bool = True) -> dict:
+    """One shard as {column: array}; npy columns are memory-mapped unless mmap=False."""
+    columns = columns or list(manifest["columns"])
+    if manifest["format"] == "npy":
+        return {
+            col: np.load(os.path.join(path, f"{shard['name']}.{col}.npy"), mmap_mode="r" if mmap else None)
+            for col in columns
+        }
+    pa = _pyarrow()
+    table = pa.parquet.read_table(os.path.join(path, f"{shard['name']}.parquet"), columns=columns)
+    return {col: table.column(col).to_numpy() for col in columns}
+
+
+def iter_shards(path: str, columns: list = None, mmap: bool = True):
+    """Yields one {column: array} dict per shard, in write order."""
+    manifest = read_manifest(path)
+    for shard in manifest["shards"]:
+        yield read_shard(path, manifest, shard, columns, mmap)
+
+
+def read_columns(path: str, columns: list = None) -> dict:
+    """Whole dataset as one contiguous array per column (preallocated, filled shard by shard)."""
+    manifest = read_manifest(path)
+    columns  = columns or list(manifest["columns"])
+    out = {col: np.empty(manifest["rows"], dtype=np.dtype(manifest["columns"][col])) for col in columns}
+    at = 0
+    for shard in iter_shards(path, columns):
+        n = len(shard[columns[0]])
+        for col in columns:
+            out[col][at:at + n] = shard[col]
+        at += n
+    return out
+
+
+def read_entities(path: str) -> dict:
+    with np.load(os.path.join(path, ENTITIES)) as f:
+        return {key: f[key] for key in f.files}
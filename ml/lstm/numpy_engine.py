@@ -0,0 +1,88 @@
+"""
+AquaSentinel — NumPy LSTM Inference Engine
+Person 2 owns this file.
+Pure NumPy forward pass for the LSTM(64) → LSTM(32) → Dense(1) forecaster,
+so API workers never have to import TensorFlow.
+
+Weights come from weights.npz, written by train.py (export_weights).
+Keras conventions: gate order i, f, c, o | sigmoid recurrent activation | tanh.
+
+Usage:
+  from lstm.numpy_engine import load_engine
+  model, scaler = load_engine("weights.npz")
+  model.predict(x)              # x: (N, 12, 1) → (N, 1)
+"""
+
+import numpy as np
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class NumpyScaler:
+    """MinMaxScaler.transform / inverse_transform from exported min_ and scale_."""
+
+    def __init__(self, min_, scale_):
+        self.min_   = np.asarray(min_,   dtype=np.float64)
+        self.scale_ = np.asarray(scale_, dtype=np.float64)
+
+    def transform(self, X):
+        return np.asarray(X, dtype=np.float64) * self.scale_ + self.min_
+
+    def inverse_transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.min_) / self.scale_
+
+
+class NumpyLSTM:
+    """Stacked LSTM layers followed by one Dense layer, evaluated with NumPy."""
+
+    def __init__(self, lstm_layers, dense_kernel, dense_bias):
+        # lstm_layers: list of (kernel, recurrent_kernel, bias) in Keras layout
+        self.lstm_layers  = lstm_layers
+        self.dense_kernel = dense_kernel
+        self.dense_bias   = dense_bias
+
+    @staticmethod
+    def _lstm(x, kernel, recurrent, bias):
+        n, steps, _ = x.shape
+        units = recurrent.shape[0]
+        h = np.zeros((n, units))
+        c = np.zeros((n, units))
+        # Input projection for every timestep in one matmul
+        xw = x @ kernel + bias
+        outputs = np.empty((n, steps, units))
+        for t in range(steps):
+            z = xw[:, t] + h @ recurrent
+            i = _sigmoid(z[:, :units])
+            f = _sigmoid(z[:, units:2 * units])
+            g = np.tanh(z[:, 2 * units:3 * units])
+            o = _sigmoid(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * np.tanh(c)
+            outputs[:, t] = h
+        return outputs
+
+    def predict(self, x, verbose=0):
+        """Same call shape as keras Model.predict: (N, T, 1) → (N, 1)."""
+        out = np.asarray(x, dtype=np.float64)
+        for kernel, recurrent, bias in self.lstm_layers:
+            out = self._lstm(out, kernel, recurrent, bias)
+        return out[:, -1] @ self.dense_kernel + self.dense_bias
+
+
+def load_engine(path: str):
+    """Loads weights.npz and returns (NumpyLSTM, NumpyScaler)."""
+    with np.load(path) as w:
+        n_lstm = sum(1 for k in w.files if k.endswith("_kernel") and k.startswith("lstm"))
+        layers = [
+            (w[f"lstm{k}_kernel"].astype(np.float64),
+             w[f"lstm{k}_recurrent"].astype(np.float64),
+             w[f"lstm{k}_bias"].astype(np.float64))
+            for k in range(n_lstm)
+        ]
+        model  = NumpyLSTM(layers,
+                           w["dense_kernel"].astype(np.float64),
+                           w["dense_bias"].astype(np.float64))
+        scaler = NumpyScaler(w["scaler_min"], w["scaler_scale"])
+    return model, scaler
@@ -4,30 +4,94 @@ Person 2 owns this file.
 Called by backend/routes/forecast.py
 
 Usage:
-  from ml.lstm.predict import forecast_depletion
-  predictions = forecast_depletion(last_12_months=[...], steps=6)
+  from predictors import lstm_predict      # see ml/predictors.py
+  predictions = lstm_predict.forecast_depletion(last_12_months=[...], steps=6)
+  batch       = lstm_predict.forecast_depletion_batch([[...], [...]], steps=6)
+
+Backends (LSTM_BACKEND env var):
+  numpy       — default. Pure NumPy forward pass over weights.npz, no TensorFlow import
+  tensorflow  — original Keras model.h5 + scaler.pkl
+
+Artifacts come from the active "lstm" version in the model registry (see ml/registry.py),
+or from this directory when nothing is published. A newly activated version is loaded in
+the background and swapped in without a restart; model_version() names the one serving.
 """
 
 import numpy as np
 import pickle
 import os
+import sys
 
-MODEL_PATH  = os.path.join(os.path.dirname(__file__), "model.h5")
-SCALER_PATH = os.path.join(os.path.dirname(__file__), "scaler.pkl")
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from registry import ModelSlot, has_model
 
-# Lazy-load so import doesn't fail if model not yet trained
-_model  = None
-_scaler = None
+MODEL_FILE   = "model.h5"       # artifact names inside a registry version (or this directory)
+SCALER_FILE  = "scaler.pkl"
+WEIGHTS_FILE = "weights.npz"
+LOOKBACK     = 12    # must match train.py
+BACKEND      = os.getenv("LSTM_BACKEND", "numpy").lower()
+BACKEND_LABELS = {"numpy": "NumPy", "tensorflow": "TensorFlow/Keras"}
 
 
-def _load():
-    global _model, _scaler
-    if _model is None:
+def _load(directory: str):
+    """(model, scaler) from one artifact directory, for the configured backend."""
+    if BACKEND == "tensorflow":
         import tensorflow as tf
-        _model = tf.keras.models.load_model(MODEL_PATH)
-    if _scaler is None:
-        with open(SCALER_PATH, "rb") as f:
-            _scaler = pickle.load(f)
+        model = tf.keras.models.load_model(os.path.join(directory, MODEL_FILE), compile=False)
+        with open(os.path.join(directory, SCALER_FILE), "rb") as f:
+            return model, pickle.load(f)
+    from lstm.numpy_engine import load_engine
+    return load_engine(os.path.join(directory, WEIGHTS_FILE))
+
+
+# Lazy-load so import doesn't fail if model not yet trained
+_slot = ModelSlot("lstm", _load, fallback_dir=os.path.dirname(__file__))
+
+
+def model_version() -> str:
+    """Registry version currently serving (loads the model on first call)."""
+    return _slot.version()
+
+
+def model_available() -> bool:
+    """Whether there is a trained model to serve: a registry version or artifacts in this directory."""
+    artifact = MODEL_FILE if BACKEND == "tensorflow" else WEIGHTS_FILE
+    return has_model("lstm", os.path.join(os.path.dirname(__file__), artifact))
+
+
+def backend_label() -> str:
+    """Human-readable name of the active inference backend."""
+    return BACKEND_LABELS.get(BACKEND, BACKEND)
+
+
+def forecast_depletion_batch(series_batch: list, steps: int = 6) -> list:
+    """
+    Forecasts many series at once.
+    Takes a list of N histories (each at least 12 monthly depths, metres).
+    Returns N lists of `steps` predicted future depth values.
+
+    All series advance together: one (N, 12, 1) tensor per step, so a
+    6-step horizon costs 6 forward passes regardless of N.
+    """
+    _, (model, scaler) = _slot.get()   # one version for the whole batch, even mid-swap
+
+    data = np.array([s[-LOOKBACK:] for s in series_batch], dtype=float)
+    n    = data.shape[0]
+    if n == 0:
+        return []
+
+    window = scaler.transform(data.reshape(-1, 1)).reshape(n, LOOKBACK)
+    predictions = np.empty((n, steps))
+
+    for step in range(steps):
+        x    = window.reshape(n, LOOKBACK, 1)
+        pred = model.predict(x, verbose=0)[:, 0]
+        predictions[:, step] = pred
+        window = np.roll(window, -1, axis=1)
+        window[:, -1] = pred
+
+    raw = predictions.reshape(-1, 1)
+    return scaler.inverse_transform(raw).reshape(n, steps).tolist()
 
 
 def forecast_depletion(last_12_months: list, steps: int = 6) -> list:
@@ -39,20 +103,4 @@ def forecast_depletion(last_12_months: list, steps: int = 6) -> list:
       forecast_depletion([30.1, 30.8, 31.2, ...], steps=6)
       → [36.4, 37.1, 37.8, 38.5, 39.1, 39.7]
     """
-    _load()
-
-    data   = np.array(last_12_months).reshape(-1, 1)
-    scaled = _scaler.transform(data)
-
-    predictions = []
-    window = scaled[-12:].copy()
-
-    for _ in range(steps):
-        x    = window.reshape(1, 12, 1)
-        pred = _model.predict(x, verbose=0)[0][0]
-        predictions.append(pred)
-        window = np.roll(window, -1)
-        window[-1] = pred
-
-    raw = np.array(predictions).reshape(-1, 1)
-    return _scaler.inverse_transform(raw).flatten().tolist()
+    return forecast_depletion_batch([last_12_months], steps=steps)[0]
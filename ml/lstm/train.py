@@ -7,49 +7,144 @@ What it does:
   Architecture: LSTM(64) → Dropout(0.2) → LSTM(32) → Dense(1)
 
 Run AFTER generate_mock.py:
-  python train.py
+  python train.py [--epochs 60] [--batch 32]
+
+Reads ../data/depletion_series/ (columnar shards) when present, else depletion_series.csv.
+Training windows are never materialized up front: one shard at a time is memory-mapped,
+scaled, and batches are gathered from a strided window view and streamed through tf.data
+with prefetching, so memory stays flat however many wells or months there are.
+Validation holds out whole series (~15% of entities) rather than random windows.
 
 Output:
   model.h5    — trained Keras model
   scaler.pkl  — MinMaxScaler (must be used for inference too)
+  weights.npz — LSTM/Dense weights + scaler params for the NumPy engine
+
+Re-export weights.npz from an existing model.h5 without retraining:
+  python train.py --export-only
+
+Every run also publishes the three artifacts as a new, active "lstm" version in the
+model registry (ml/registry.py), which running backends pick up without a restart.
+Pass --no-publish to only write the files above.
 """
 
+import argparse
+import itertools
 import numpy as np
 import pandas as pd
 import pickle
 import os
+import sys
 import tensorflow as tf
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.preprocessing import MinMaxScaler
-from sklearn.model_selection import train_test_split
 
 # ── Config ────────────────────────────────────────────────────────────
 LOOKBACK  = 12    # months of history fed into LSTM
 FORECAST  = 6     # months to predict ahead
 EPOCHS    = 60
 BATCH     = 32
+VAL_FRACTION = 0.15
 DATA_PATH = os.path.join(os.path.dirname(__file__), "../data/depletion_series.csv")
+SHARDS_PATH = os.path.join(os.path.dirname(__file__), "../data/depletion_series")
 MODEL_OUT = os.path.join(os.path.dirname(__file__), "model.h5")
 SCALER_OUT= os.path.join(os.path.dirname(__file__), "scaler.pkl")
+WEIGHTS_OUT = os.path.join(os.path.dirname(__file__), "weights.npz")
+PARITY_TOL  = 1e-4   # max abs difference allowed between Keras and NumPy outputs
+COLUMNS     = ["entity", "month", "depth_m"]
+
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from data.shards import is_dataset, read_manifest, read_shard
+from registry import publish, version_dir
+
+
+def chunk_loaders() -> list:
+    """
+    One zero-argument loader per chunk of {entity, month, depth_m} columns, sorted by
+    (entity, month): a memory-mapped shard each, or the whole CSV as a single chunk.
+    Shards hold whole series, as generate_mock.py writes them.
+    """
+    if is_dataset(SHARDS_PATH):
+        manifest = read_manifest(SHARDS_PATH)
+        return [lambda shard=shard: read_shard(SHARDS_PATH, manifest, shard, COLUMNS)
+                for shard in manifest["shards"]]
+
+    def load_csv():
+        df = pd.read_csv(DATA_PATH).sort_values(["state", "month"], kind="stable")
+        return {
+            "entity":  pd.factorize(df["state"])[0].astype(np.int32),
+            "month":   df["month"].to_numpy(),
+            "depth_m": df["depth_m"].to_numpy(np.float32),
+        }
+    return [load_csv]
+
+
+def fit_scaler(loaders) -> MinMaxScaler:
+    """MinMaxScaler over every depth, one chunk at a time (only its min and max are kept)."""
+    scaler = MinMaxScaler()
+    for load in loaders:
+        depth = load()["depth_m"]
+        scaler.partial_fit(np.array([[depth.min()], [depth.max()]], dtype=np.float64))
+    return scaler
+
+
+def is_validation(entity: np.ndarray) -> np.ndarray:
+    """Deterministic ~VAL_FRACTION hold-out of whole series (multiplicative hash of the entity id)."""
+    bucket = (entity.astype(np.uint64) * np.uint64(2654435761)) % np.uint64(1000)
+    return bucket < VAL_FRACTION * 1000
+
+
+def window_starts(chunk: dict, validation: bool, lookback: int = LOOKBACK) -> np.ndarray:
+    """Rows that start a (lookback + 1)-month window inside one series with no missing months."""
+    entity, month = chunk["entity"], chunk["month"]
+    n = len(entity) - lookback
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+    inside = (entity[:n] == entity[lookback:]) & (month[lookback:] - month[:n] == lookback)
+    return np.flatnonzero(inside & (is_validation(entity[:n]) == validation))
+
+
+def make_windows(scaled: np.ndarray, starts: np.ndarray, lookback: int = LOOKBACK):
+    """(X, y) for the given start rows; only the gathered windows are copied out of the strided view."""
+    windows = sliding_window_view(scaled, lookback + 1)[starts]
+    return windows[:, :lookback, None], windows[:, lookback:]
 
 
-def load_data():
-    df = pd.read_csv(DATA_PATH)
-    all_series = []
-    for state in df["state"].unique():
-        series = df[df["state"] == state].sort_values("month")["depth_m"].values
-        all_series.append(series)
-    return all_series
+def window_batches(loaders, scaler, validation: bool, batch: int = BATCH, seed=None):
+    """
+    Yields (X, y) float32 batches, one chunk resident at a time. With a seed, chunk order
+    and window order within each chunk are shuffled (a new permutation per seed).
+    """
+    rng   = np.random.default_rng(seed) if seed is not None else None
+    order = rng.permutation(len(loaders)) if rng is not None else range(len(loaders))
+    scale, offset = np.float32(scaler.scale_[0]), np.float32(scaler.min_[0])
+    for k in order:
+        chunk  = loaders[k]()
+        starts = window_starts(chunk, validation)
+        if rng is not None:
+            rng.shuffle(starts)
+        scaled = np.asarray(chunk["depth_m"], dtype=np.float32) * scale + offset
+        for lo in range(0, len(starts), batch):
+            yield make_windows(scaled, starts[lo:lo + batch])
 
 
-def make_sequences(series_list, lookback=LOOKBACK):
-    """Create (X, y) pairs from all state time series."""
-    X, y = [], []
-    for series in series_list:
-        scaled = scaler.transform(series.reshape(-1, 1))
-        for i in range(len(scaled) - lookback):
-            X.append(scaled[i:i + lookback])
-            y.append(scaled[i + lookback])
-    return np.array(X), np.array(y)
+def count_windows(loaders, validation: bool) -> list:
+    """Windows per chunk; only the entity and month columns are touched."""
+    return [len(window_starts(load(), validation)) for load in loaders]
+
+
+def make_dataset(loaders, scaler, validation: bool, counts: list, batch: int = BATCH, shuffle: bool = True):
+    """tf.data pipeline over window_batches; a fresh shuffle seed every epoch, prefetched."""
+    epochs  = itertools.count()
+    batches = sum(-(-n // batch) for n in counts)
+
+    def generate():
+        yield from window_batches(loaders, scaler, validation, batch, seed=next(epochs) if shuffle else None)
+
+    spec = (tf.TensorSpec((None, LOOKBACK, 1), tf.float32), tf.TensorSpec((None, 1), tf.float32))
+    dataset = tf.data.Dataset.from_generator(generate, output_signature=spec)
+    return dataset.apply(tf.data.experimental.assert_cardinality(batches)).prefetch(tf.data.AUTOTUNE)
 
 
 def build_model():
@@ -64,43 +159,113 @@ def build_model():
     return model
 
 
+def export_weights(model, scaler, path=WEIGHTS_OUT):
+    """Writes LSTM/Dense weights and MinMaxScaler params to a compact .npz."""
+    arrays = {
+        "scaler_min":   scaler.min_.astype(np.float32),
+        "scaler_scale": scaler.scale_.astype(np.float32),
+    }
+    n_lstm = 0
+    for layer in model.layers:
+        if isinstance(layer, tf.keras.layers.LSTM):
+            kernel, recurrent, bias = layer.get_weights()
+            arrays[f"lstm{n_lstm}_kernel"]    = kernel
+            arrays[f"lstm{n_lstm}_recurrent"] = recurrent
+            arrays[f"lstm{n_lstm}_bias"]      = bias
+            n_lstm += 1
+        elif isinstance(layer, tf.keras.layers.Dense):
+            arrays["dense_kernel"], arrays["dense_bias"] = layer.get_weights()
+    np.savez_compressed(path, **arrays)
+    print(f"Weights exported → {path}")
+
+
+def check_parity(model, X, path=WEIGHTS_OUT, tol=PARITY_TOL):
+    """Asserts the NumPy engine reproduces Keras predictions on X."""
+    from lstm.numpy_engine import load_engine
+
+    np_model, _ = load_engine(path)
+    keras_out = model.predict(X, verbose=0)
+    numpy_out = np_model.predict(X)
+    max_diff  = float(np.max(np.abs(keras_out - numpy_out)))
+    print(f"NumPy/Keras parity on {len(X)} windows: max abs diff {max_diff:.2e}")
+    assert max_diff < tol, f"NumPy engine diverges from Keras (max diff {max_diff:.2e} >= {tol})"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the LSTM depletion forecaster")
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--batch",  type=int, default=BATCH)
+    parser.add_argument("--export-only", action="store_true",
+                        help="re-export weights.npz from model.h5 without retraining")
+    parser.add_argument("--no-publish", action="store_true",
+                        help="do not publish the artifacts to the model registry")
+    return parser.parse_args(argv)
+
+
+def publish_artifacts(metadata: dict):
+    version = publish("lstm", {"model.h5": MODEL_OUT, "scaler.pkl": SCALER_OUT, "weights.npz": WEIGHTS_OUT},
+                      metadata=metadata)
+    print(f"Published lstm version {version} → {version_dir('lstm', version)}")
+
+
+def parity_sample(loaders, scaler, n=512):
+    """First n validation windows (training windows if the hold-out is empty)."""
+    for validation in (True, False):
+        batch = next(window_batches(loaders, scaler, validation, batch=n), None)
+        if batch is not None:
+            return batch[0]
+
+
 if __name__ == "__main__":
-    print("Loading data...")
-    all_series = load_data()
-    all_values = np.concatenate(all_series).reshape(-1, 1)
+    args    = parse_args()
+    loaders = chunk_loaders()
 
-    print("Fitting scaler...")
-    scaler = MinMaxScaler()
-    scaler.fit(all_values)
+    if args.export_only:
+        model = tf.keras.models.load_model(MODEL_OUT, compile=False)   # inference only
+        with open(SCALER_OUT, "rb") as f:
+            scaler = pickle.load(f)
+        export_weights(model, scaler)
+        check_parity(model, parity_sample(loaders, scaler))
+        if not args.no_publish:
+            publish_artifacts({"source": "export-only"})
+        sys.exit(0)
+
+    print(f"Fitting scaler over {len(loaders)} chunk(s)...")
+    scaler = fit_scaler(loaders)
     with open(SCALER_OUT, "wb") as f:
         pickle.dump(scaler, f)
     print(f"Scaler saved → {SCALER_OUT}")
 
-    print("Building sequences...")
-    X, y = make_sequences(all_series)
-    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.15, random_state=42)
-    print(f"  Training samples: {len(X_train)} | Validation: {len(X_val)}")
+    train_counts, val_counts = count_windows(loaders, False), count_windows(loaders, True)
+    n_train, n_val = sum(train_counts), sum(val_counts)
+    print(f"  Training windows: {n_train} | Validation: {n_val} (streamed, batch {args.batch})")
+    train_ds = make_dataset(loaders, scaler, False, train_counts, batch=args.batch)
+    val_ds   = make_dataset(loaders, scaler, True, val_counts, batch=args.batch, shuffle=False) if n_val else None
+    monitor  = "val_loss" if n_val else "loss"
 
     print("Training LSTM...")
     model = build_model()
     model.summary()
 
     callbacks = [
-        tf.keras.callbacks.EarlyStopping(patience=8, restore_best_weights=True),
-        tf.keras.callbacks.ReduceLROnPlateau(patience=4, factor=0.5),
+        tf.keras.callbacks.EarlyStopping(monitor=monitor, patience=8, restore_best_weights=True),
+        tf.keras.callbacks.ReduceLROnPlateau(monitor=monitor, patience=4, factor=0.5),
     ]
     history = model.fit(
-        X_train, y_train,
-        validation_data=(X_val, y_val),
-        epochs=EPOCHS,
-        batch_size=BATCH,
+        train_ds,
+        validation_data=val_ds,
+        epochs=args.epochs,
         callbacks=callbacks,
         verbose=1,
     )
 
     model.save(MODEL_OUT)
     print(f"\nModel saved → {MODEL_OUT}")
+    export_weights(model, scaler)
+    check_parity(model, parity_sample(loaders, scaler))
 
-    val_loss = min(history.history["val_loss"])
-    print(f"Best validation MSE: {val_loss:.6f}")
+    best = min(history.history[monitor])
+    print(f"Best {'validation' if n_val else 'training'} MSE: {best:.6f}")
+    if not args.no_publish:
+        publish_artifacts({"best_mse": float(best), "monitor": monitor, "train_windows": n_train})
     print("Training complete!")
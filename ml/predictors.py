@@ -0,0 +1,38 @@
+"""
+AquaSentinel — Predictor Imports
+Person 2 owns this file.
+The one place the backend imports the predict modules from (with ml/ on sys.path).
+
+ml/xgboost/ cannot be imported as a package: the name `xgboost` is the XGBoost library,
+which unpickling the classifier needs, and which sits ahead of ml/ on sys.path. Its
+predict.py is loaded from its path as the module `xgboost_predict` instead.
+
+Usage:
+  from predictors import lstm_predict, xgboost_predict
+  results = xgboost_predict.predict_risk_batch([{...}, {...}])
+"""
+
+import importlib.util
+import os
+import sys
+
+from lstm import predict as lstm_predict
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _load(name: str, path: str):
+    if name in sys.modules:
+        return sys.modules[name]
+    spec   = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+xgboost_predict = _load("xgboost_predict", os.path.join(ML_DIR, "xgboost", "predict.py"))
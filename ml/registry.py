@@ -0,0 +1,208 @@
+"""
+AquaSentinel — Model Registry
+Person 2 owns this file.
+Versioned model artifacts plus a manifest naming the active version of each model.
+train.py scripts publish into it; predict.py modules serve from it and hot-swap.
+
+Layout (MODEL_REGISTRY_DIR, default ml/models/):
+  manifest.json                  — {"lstm": {"active": "20260115-093000", "versions": {...}}, ...}
+  lstm/<version>/weights.npz     — artifacts of one version, never modified after publish
+  xgboost/<version>/model.pkl
+
+Usage:
+  from registry import publish, has_model, ModelSlot
+  publish("xgboost", {"model.pkl": "model.pkl"}, metadata={"accuracy": 0.97})
+  slot = ModelSlot("xgboost", load_fn, fallback_dir=os.path.dirname(__file__))
+  version, model = slot.get()
+
+Activating another version is a manifest rewrite (os.replace, so readers never see a
+partial file). Each ModelSlot notices the change on its next get() — the manifest's
+mtime is checked at most every MODEL_RELOAD_CHECK_S — and loads the new version on a
+background thread while callers keep getting the old one; the swap is one reference
+assignment, so a request that already holds the old model finishes with it.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import logging
+
+REGISTRY_DIR   = os.getenv("MODEL_REGISTRY_DIR", os.path.join(os.path.dirname(__file__), "models"))
+MANIFEST       = "manifest.json"
+CHECK_INTERVAL = float(os.getenv("MODEL_RELOAD_CHECK_S", "5"))
+UNVERSIONED    = "unversioned"    # label for legacy artifacts next to predict.py
+
+log = logging.getLogger(__name__)
+_manifest_lock  = threading.Lock()
+_manifest_cache = (None, {})     # (mtime_ns, parsed manifest) behind read_manifest()
+
+
+def _manifest_path() -> str:
+    return os.path.join(REGISTRY_DIR, MANIFEST)
+
+
+def _load_manifest() -> dict:
+    try:
+        with open(_manifest_path()) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def read_manifest() -> dict:
+    """
+    The manifest, parsed again only when its mtime changes (every write replaces the file),
+    so lookups cost one stat(). The dict is shared: treat it as read-only.
+    """
+    global _manifest_cache
+    try:
+        mtime = os.stat(_manifest_path()).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    cached_mtime, manifest = _manifest_cache
+    if mtime != cached_mtime:
+        manifest = _load_manifest()
+        _manifest_cache = (mtime, manifest)
+    return manifest
+
+
+def _write_manifest(manifest: dict):
+    tmp = _manifest_path() + f".{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, _manifest_path())
+
+
+def version_dir(name: str, version: str) -> str:
+    return os.path.join(REGISTRY_DIR, name, version)
+
+
+def active_version(name: str):
+    return read_manifest().get(name, {}).get("active")
+
+
+def has_model(name: str, fallback_file: str) -> bool:
+    """True when `name` has an active version, or its legacy artifact `fallback_file` exists."""
+    return active_version(name) is not None or os.path.exists(fallback_file)
+
+
+def publish(name: str, artifacts: dict, version: str = None, metadata: dict = None,
+            activate: bool = True) -> str:
+    """
+    Copies {artifact file name: source path} into a new version directory and records it
+    in the manifest (made active unless activate=False). Returns the version.
+    """
+    if version is None:
+        # Timestamp plus a counter for publishes within the same second
+        stamp, n = time.strftime("%Y%m%d-%H%M%S"), 1
+        version = stamp
+        while os.path.exists(version_dir(name, version)):
+            n += 1
+            version = f"{stamp}-{n}"
+    target = version_dir(name, version)
+    if os.path.exists(target):
+        raise FileExistsError(f"{name} version {version} is already published")
+    staging = f"{target}.{os.getpid()}.partial"
+    try:
+        os.makedirs(staging)
+        for artifact, src in artifacts.items():
+            shutil.copy2(src, os.path.join(staging, artifact))
+        os.rename(staging, target)     # fails, rather than merging, if target appeared meanwhile
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    with _manifest_lock:
+        manifest = _load_manifest()
+        entry = manifest.setdefault(name, {"active": None, "versions": {}})
+        entry["versions"][version] = {"published_at": time.time(), "artifacts": sorted(artifacts),
+                                      **(metadata or {})}
+        if activate:
+            entry["active"] = version
+        _write_manifest(manifest)
+    return version
+
+
+def activate(name: str, version: str):
+    """Points `name` at an already-published version (rollback / roll-forward)."""
+    with _manifest_lock:
+        manifest = _load_manifest()
+        if version not in manifest.get(name, {}).get("versions", {}):
+            raise KeyError(f"{name} has no published version {version!r}")
+        manifest[name]["active"] = version
+        _write_manifest(manifest)
+
+
+class ModelSlot:
+    """
+    The active (version, model) of one registry entry.
+    `loader(directory)` builds the model from a version directory. Without a registry
+    entry, `fallback_dir` (the legacy artifacts next to predict.py) is served as
+    UNVERSIONED.
+    """
+
+    def __init__(self, name: str, loader, fallback_dir: str = None):
+        self.name, self._loader, self._fallback_dir = name, loader, fallback_dir
+        self._current   = None            # (version, model), replaced as a whole
+        self._loading   = None            # version being loaded in the background
+        self._lock      = threading.Lock()
+        self._checked   = 0.0
+        self._mtime     = None
+
+    def _target(self):
+        version = active_version(self.name)
+        if version is not None:
+            return version, version_dir(self.name, version)
+        return UNVERSIONED, self._fallback_dir
+
+    def get(self):
+        current = self._current
+        if current is None:
+            with self._lock:                      # first use: load synchronously
+                if self._current is None:
+                    self._mtime = self._manifest_mtime()
+                    version, path = self._target()
+                    self._current = (version, self._loader(path))
+                return self._current
+        self._maybe_reload()
+        return current
+
+    def version(self) -> str:
+        return self.get()[0]
+
+    def _manifest_mtime(self):
+        try:
+            return os.stat(_manifest_path()).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked < CHECK_INTERVAL:
+            return
+        self._checked = now
+        mtime = self._manifest_mtime()
+        if mtime == self._mtime:
+            return
+        version, path = self._target()
+        with self._lock:
+            if version == self._current[0] or version == self._loading:
+                self._mtime = mtime
+                return
+            self._loading = version
+        threading.Thread(target=self._load, args=(version, path, mtime), daemon=True,
+                         name=f"model-reload-{self.name}").start()
+
+    def _load(self, version: str, path: str, mtime):
+        try:
+            model = self._loader(path)
+        except Exception:
+            log.exception("loading %s version %s failed; keeping %s", self.name, version, self._current[0])
+            with self._lock:
+                self._loading, self._mtime = None, mtime   # retried when the manifest changes again
+            return
+        with self._lock:
+            self._current, self._loading, self._mtime = (version, model), None, mtime
+        log.info("%s now serving version %s", self.name, version)
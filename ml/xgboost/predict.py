@@ -4,15 +4,24 @@ Person 2 owns this file.
 Called by backend/routes/forecast.py
 
 Usage:
-  from ml.xgboost_model.predict import predict_risk_score
-  score = predict_risk_score({"depth_m": 42, "extraction_rate": 7.3, ...})
+  from predictors import xgboost_predict   # loaded by path, see ml/predictors.py
+  score   = xgboost_predict.predict_risk_score({"depth_m": 42, "extraction_rate": 7.3, ...})
+  results = xgboost_predict.predict_risk_batch([{...}, {...}])   # one model call for all records
+
+The classifier comes from the active "xgboost" version in the model registry (see
+ml/registry.py), or model.pkl in this directory when nothing is published. A newly
+activated version is swapped in without a restart; model_version() names the one serving.
 """
 
 import pickle
 import os
+import sys
 import numpy as np
 
-MODEL_PATH = os.path.join(os.path.dirname(__file__), "model.pkl")
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from registry import ModelSlot, has_model
+
+MODEL_FILE = "model.pkl"
 FEATURES   = [
     "depth_m", "extraction_rate", "geology_score",
     "rainfall_mm", "fluoride_hist", "arsenic_hist", "iron_hist"
@@ -20,14 +29,72 @@ FEATURES   = [
 LABEL_NAMES = {0: "low", 1: "moderate", 2: "high", 3: "critical"}
 SCORE_MAP   = {"low": 20, "moderate": 45, "high": 72, "critical": 90}
 
-_model = None
+# Median values used for any feature a record leaves out
+DEFAULTS = {
+    "depth_m":         20.0,
+    "extraction_rate":  3.0,
+    "geology_score":    0.5,
+    "rainfall_mm":     800.0,
+    "fluoride_hist":    0.5,
+    "arsenic_hist":     0.01,
+    "iron_hist":        0.3,
+}
+
+# Base score per class index, aligned with LABEL_NAMES
+_BASE_SCORES = np.array([SCORE_MAP[LABEL_NAMES[i]] for i in range(len(LABEL_NAMES))], dtype=float)
+
+
+def _load(directory: str):
+    with open(os.path.join(directory, MODEL_FILE), "rb") as f:
+        return pickle.load(f)
+
+
+_slot = ModelSlot("xgboost", _load, fallback_dir=os.path.dirname(__file__))
+
+
+def model_version() -> str:
+    """Registry version currently serving (loads the model on first call)."""
+    return _slot.version()
+
+
+def model_available() -> bool:
+    """Whether there is a trained model to serve: a registry version or model.pkl in this directory."""
+    return has_model("xgboost", os.path.join(os.path.dirname(__file__), MODEL_FILE))
 
 
-def _load():
-    global _model
-    if _model is None:
-        with open(MODEL_PATH, "rb") as f:
-            _model = pickle.load(f)
+def _to_matrix(records) -> np.ndarray:
+    """List of feature dicts (missing keys → DEFAULTS) or an (N, 7) array → float matrix."""
+    if isinstance(records, np.ndarray):
+        X = records.astype(float, copy=False)
+    else:
+        X = np.array([[r.get(f, DEFAULTS[f]) for f in FEATURES] for r in records], dtype=float)
+    if X.ndim != 2 or X.shape[1] != len(FEATURES):
+        raise ValueError(f"expected shape (N, {len(FEATURES)}), got {X.shape}")
+    return X
+
+
+def predict_risk_batch(records) -> list:
+    """
+    Scores many records with a single predict_proba call.
+    Takes a list of feature dicts or a 2-D array with columns in FEATURES order.
+
+    Returns one {"risk_score": float, "risk_label": str} per record.
+    Label is the argmax class; score blends its base score with the max class probability.
+    """
+    X = _to_matrix(records)
+    if len(X) == 0:
+        return []
+    _, model = _slot.get()
+
+    proba     = model.predict_proba(X)
+    class_idx = proba.argmax(axis=1)
+    # Blend with max class probability for finer granularity
+    scores = np.minimum(_BASE_SCORES[class_idx] * 0.7 + proba.max(axis=1) * 30, 100).round(1)
+
+    return [
+        {"risk_score": float(s), "risk_label": LABEL_NAMES[int(c)]}
+        for s, c in zip(scores, class_idx)
+    ]
 
 
 def predict_risk_score(features: dict) -> float:
@@ -40,37 +107,9 @@ def predict_risk_score(features: dict) -> float:
 
     Returns float 0–100 (higher = worse contamination risk)
     """
-    _load()
-
-    defaults = {
-        "depth_m":         20.0,
-        "extraction_rate":  3.0,
-        "geology_score":    0.5,
-        "rainfall_mm":     800.0,
-        "fluoride_hist":    0.5,
-        "arsenic_hist":     0.01,
-        "iron_hist":        0.3,
-    }
-    defaults.update(features)
-
-    X = np.array([[defaults[f] for f in FEATURES]])
-    class_idx  = int(_model.predict(X)[0])
-    proba      = _model.predict_proba(X)[0]
-    label      = LABEL_NAMES[class_idx]
-    base_score = SCORE_MAP[label]
-
-    # Blend with max class probability for finer granularity
-    score = base_score * 0.7 + max(proba) * 30
-    return round(min(score, 100), 1)
+    return predict_risk_batch([features])[0]["risk_score"]
 
 
 def predict_risk_label(features: dict) -> str:
     """Returns 'low' | 'moderate' | 'high' | 'critical'"""
-    _load()
-    defaults = {
-        "depth_m": 20.0, "extraction_rate": 3.0, "geology_score": 0.5,
-        "rainfall_mm": 800.0, "fluoride_hist": 0.5, "arsenic_hist": 0.01, "iron_hist": 0.3,
-    }
-    defaults.update(features)
-    X = np.array([[defaults[f] for f in FEATURES]])
-    return LABEL_NAMES[int(_model.predict(X)[0])]
+    return predict_risk_batch([features])[0]["risk_label"]
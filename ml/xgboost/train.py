@@ -7,23 +7,40 @@ What it does:
   Features: depth, extraction rate, geology, rainfall, fluoride, arsenic, iron
 
 Run AFTER generate_mock.py:
-  python train.py
+  python train.py                      # 80/20 hold-out, histogram trees on all cores
+  python train.py --cv 5 --jobs 5      # 5-fold CV, folds trained in parallel processes
+  python train.py --external-memory    # page the quantized data through a disk cache
+
+Reads ../data/contamination_records/ (columnar shards) when present, else the CSV.
+Data is fed to XGBoost one chunk at a time through a DataIter, so the raw float
+columns are never concatenated: QuantileDMatrix keeps only the binned matrix in RAM,
+and --external-memory (ExtMemQuantileDMatrix) keeps even that on disk. Every stage
+prints wall-clock time, peak memory and throughput.
 
 Output:
   model.pkl     — trained XGBoost classifier
   features.txt  — feature order required for inference
+
+Both are also published as a new, active "xgboost" version in the model registry
+(ml/registry.py), which running backends pick up without a restart (--no-publish skips it).
 """
 
+import argparse
+import os
+import pickle
+import resource
+import shutil
+import sys
+import tempfile
+import time
 import numpy as np
 import pandas as pd
-import pickle
-import os
 import xgboost as xgb
-from sklearn.model_selection import train_test_split
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.metrics import classification_report, accuracy_score
-from sklearn.preprocessing import LabelEncoder
 
 DATA_PATH   = os.path.join(os.path.dirname(__file__), "../data/contamination_records.csv")
+SHARDS_PATH = os.path.join(os.path.dirname(__file__), "../data/contamination_records")
 MODEL_OUT   = os.path.join(os.path.dirname(__file__), "model.pkl")
 FEATURES_OUT= os.path.join(os.path.dirname(__file__), "features.txt")
 
@@ -38,40 +55,211 @@ FEATURES = [
 ]
 LABEL_NAMES = ["low", "moderate", "high", "critical"]
 
+N_ROUNDS = 200
+PARAMS = {
+    "objective":        "multi:softprob",
+    "num_class":        len(LABEL_NAMES),
+    "tree_method":      "hist",
+    "max_bin":          256,
+    "max_depth":        6,
+    "learning_rate":    0.1,
+    "subsample":        0.8,
+    "colsample_bytree": 0.8,
+    "eval_metric":      "mlogloss",
+    "seed":             42,
+}
+HOLDOUT_FOLDS = 5    # the default hold-out is fold 0 of 5, i.e. the old 80/20 split
+SPLIT_SEED    = 42
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from data.shards import is_dataset, read_manifest, read_shard
+from registry import publish, version_dir
+
+
+def chunk_loaders() -> list:
+    """One zero-argument loader per chunk of FEATURES + risk: a shard each, or the whole CSV."""
+    columns = FEATURES + ["risk"]
+    if is_dataset(SHARDS_PATH):
+        manifest = read_manifest(SHARDS_PATH)
+        return [lambda shard=shard: read_shard(SHARDS_PATH, manifest, shard, columns)
+                for shard in manifest["shards"]]
+    return [lambda: {c: v.to_numpy() for c, v in pd.read_csv(DATA_PATH, usecols=columns).items()}]
+
+
+def fold_of(chunk_index: int, n: int, k: int) -> np.ndarray:
+    """Fold id (0..k-1) of every row in a chunk; deterministic, so every pass agrees."""
+    return np.random.default_rng([SPLIT_SEED, chunk_index]).integers(0, k, n)
+
+
+class ChunkIter(xgb.DataIter):
+    """
+    Streams (X, y) to XGBoost one chunk at a time. With `folds=(k, held_out, keep)` only
+    rows whose fold is (keep=True) or is not (keep=False) `held_out` are passed on.
+    """
+
+    def __init__(self, loaders, folds=None, cache_prefix=None):
+        self._loaders, self._folds, self._at = loaders, folds, 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> bool:
+        if self._at == len(self._loaders):
+            return False
+        X, y = select(self._loaders, self._at, self._folds)
+        input_data(data=X, label=y, feature_names=FEATURES)
+        self._at += 1
+        return True
+
+    def reset(self):
+        self._at = 0
+
+
+def select(loaders, i: int, folds=None):
+    chunk = loaders[i]()
+    X = np.column_stack([np.asarray(chunk[f], dtype=np.float32) for f in FEATURES])
+    y = np.asarray(chunk["risk"])
+    if folds is not None:
+        k, held_out, keep = folds
+        mask = (fold_of(i, len(y), k) == held_out) == keep
+        X, y = X[mask], y[mask]
+    return X, y
+
+
+def build_matrix(loaders, folds=None, external_memory=False, cache_dir=None, ref=None):
+    """Binned training/eval matrix built chunk by chunk (on disk with external_memory)."""
+    if external_memory:
+        it = ChunkIter(loaders, folds, cache_prefix=os.path.join(cache_dir, "xgb"))
+        if hasattr(xgb, "ExtMemQuantileDMatrix"):
+            return xgb.ExtMemQuantileDMatrix(it, max_bin=PARAMS["max_bin"], ref=ref)
+        return xgb.DMatrix(it)     # xgboost < 3.0: external-memory DMatrix
+    return xgb.QuantileDMatrix(ChunkIter(loaders, folds), max_bin=PARAMS["max_bin"], ref=ref)
+
+
+def predict_labels(booster, loaders, folds=None):
+    """(y_true, y_pred, mean log loss) over the selected rows, one chunk at a time."""
+    truth, preds, loss, n = [], [], 0.0, 0
+    for i in range(len(loaders)):
+        X, y = select(loaders, i, folds)
+        if not len(y):
+            continue
+        proba = booster.inplace_predict(X)
+        truth.append(y)
+        preds.append(proba.argmax(axis=1))
+        loss += -np.log(np.clip(proba[np.arange(len(y)), y.astype(np.int64)], 1e-15, 1)).sum()
+        n += len(y)
+    return np.concatenate(truth), np.concatenate(preds), loss / max(n, 1)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process and of finished child processes (fold workers)."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, kids) / 1024    # ru_maxrss is KiB on Linux
+
+
+def report(stage: str, rows: int, seconds: float):
+    print(f"  [{stage}] wall {seconds:.2f}s | peak RSS {peak_rss_mb():.0f} MB | "
+          f"{rows / max(seconds, 1e-9):,.0f} rows/s ({rows:,} rows)")
+
+
+def train(loaders, folds=None, external_memory=False, nthread=None, rounds=N_ROUNDS, verbose=20):
+    """Trains one booster on the selected rows; evaluates on the held-out fold when there is one."""
+    cache_dir = tempfile.mkdtemp(prefix="aquasentinel-xgb-") if external_memory else None
+    try:
+        started = time.perf_counter()
+        dtrain  = build_matrix(loaders, folds, external_memory, cache_dir)
+        evals   = []
+        if folds is not None and verbose:
+            k, held_out, _ = folds
+            evals = [(build_matrix(loaders, (k, held_out, True), external_memory, cache_dir, ref=dtrain), "test")]
+        built = time.perf_counter()
+        params  = {**PARAMS, "nthread": nthread or os.cpu_count() or 1}
+        booster = xgb.train(params, dtrain, num_boost_round=rounds, evals=evals, verbose_eval=verbose)
+        return booster, dtrain.num_row(), built - started, time.perf_counter() - built
+    finally:
+        if cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def run_fold(args) -> dict:
+    """One CV fold, in a worker process: train on k-1 folds, score the held-out one."""
+    k, held_out, external_memory, nthread, rounds = args
+    loaders = chunk_loaders()
+    started = time.perf_counter()
+    booster, rows, _, _ = train(loaders, (k, held_out, False), external_memory, nthread, rounds, verbose=False)
+    y_true, y_pred, logloss = predict_labels(booster, loaders, (k, held_out, True))
+    return {
+        "fold":     held_out,
+        "rows":     rows,
+        "seconds":  time.perf_counter() - started,
+        "accuracy": accuracy_score(y_true, y_pred),
+        "mlogloss": logloss,
+        "peak_mb":  resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def cross_validate(k: int, jobs: int, external_memory: bool, rounds: int):
+    """k folds across `jobs` processes; the cores are split evenly between them."""
+    cores   = os.cpu_count() or 1
+    nthread = max(1, cores // jobs)
+    print(f"Cross-validating: {k} folds, {jobs} parallel job(s) × {nthread} thread(s)...")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(run_fold, [(k, f, external_memory, nthread, rounds) for f in range(k)]))
+    for r in results:
+        print(f"  fold {r['fold']}: accuracy {r['accuracy']:.4f} | mlogloss {r['mlogloss']:.4f} | "
+              f"{r['seconds']:.2f}s | peak {r['peak_mb']:.0f} MB")
+    acc = np.array([r["accuracy"] for r in results])
+    loss = np.array([r["mlogloss"] for r in results])
+    print(f"  CV accuracy {acc.mean():.4f} ± {acc.std():.4f} | mlogloss {loss.mean():.4f} ± {loss.std():.4f}")
+    report("cv", sum(r["rows"] for r in results), time.perf_counter() - started)
+    return {"cv_folds": k, "cv_accuracy": float(acc.mean()), "cv_mlogloss": float(loss.mean())}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the XGBoost contamination risk classifier")
+    parser.add_argument("--cv", type=int, default=0, metavar="K",
+                        help="K-fold cross-validation, then fit the saved model on all rows")
+    parser.add_argument("--jobs", type=int, default=None, help="parallel CV folds (default: min(K, cores))")
+    parser.add_argument("--external-memory", action="store_true",
+                        help="keep the quantized matrix in a disk cache instead of RAM")
+    parser.add_argument("--rounds", type=int, default=N_ROUNDS)
+    parser.add_argument("--no-publish", action="store_true",
+                        help="do not publish the model to the model registry")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    print("Loading training data...")
-    df = pd.read_csv(DATA_PATH)
-    print(f"  {len(df)} records | Class distribution:\n{df['risk'].value_counts().sort_index()}\n")
-
-    X = df[FEATURES]
-    y = df["risk"]
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
-
-    print("Training XGBoost classifier...")
-    model = xgb.XGBClassifier(
-        n_estimators=200,
-        max_depth=6,
-        learning_rate=0.1,
-        subsample=0.8,
-        colsample_bytree=0.8,
-        use_label_encoder=False,
-        eval_metric="mlogloss",
-        random_state=42,
-    )
-    model.fit(
-        X_train, y_train,
-        eval_set=[(X_test, y_test)],
-        verbose=20,
-    )
-
-    y_pred = model.predict(X_test)
-    print(f"\nTest Accuracy: {accuracy_score(y_test, y_pred):.3f}")
-    print("\nClassification Report:")
-    print(classification_report(y_test, y_pred, target_names=LABEL_NAMES))
+    args    = parse_args()
+    loaders = chunk_loaders()
+    print(f"Loading training data from {len(loaders)} chunk(s)"
+          f"{' (external memory)' if args.external_memory else ''}...")
+
+    if args.cv > 1:
+        metrics = cross_validate(args.cv, args.jobs or min(args.cv, os.cpu_count() or 1),
+                                 args.external_memory, args.rounds)
+        print("\nTraining final model on all rows...")
+        booster, rows, build_s, fit_s = train(loaders, None, args.external_memory, rounds=args.rounds)
+        report("load+bin", rows, build_s)
+        report("fit", rows, fit_s)
+    else:
+        print("Training XGBoost classifier (hist, all cores)...")
+        holdout = (HOLDOUT_FOLDS, 0, False)
+        booster, rows, build_s, fit_s = train(loaders, holdout, args.external_memory, rounds=args.rounds)
+        report("load+bin", rows, build_s)
+        report("fit", rows, fit_s)
+
+        started = time.perf_counter()
+        y_test, y_pred, _ = predict_labels(booster, loaders, (HOLDOUT_FOLDS, 0, True))
+        report("predict", len(y_test), time.perf_counter() - started)
+        metrics = {"test_accuracy": float(accuracy_score(y_test, y_pred))}
+        print(f"\nTest Accuracy: {metrics['test_accuracy']:.3f}")
+        print("\nClassification Report:")
+        print(classification_report(y_test, y_pred, labels=range(len(LABEL_NAMES)),
+                                    target_names=LABEL_NAMES, zero_division=0))
+
+    # predict.py expects the sklearn wrapper (predict_proba); load the booster into one
+    model = xgb.XGBClassifier()
+    model.load_model(bytearray(booster.save_raw("json")))
 
     # Feature importance
     importance = dict(zip(FEATURES, model.feature_importances_))
@@ -86,4 +274,8 @@ if __name__ == "__main__":
         f.write("\n".join(FEATURES))
 
     print(f"\nModel saved → {MODEL_OUT}")
+    if not args.no_publish:
+        version = publish("xgboost", {"model.pkl": MODEL_OUT, "features.txt": FEATURES_OUT},
+                          metadata={**metrics, "rows": rows, "rounds": args.rounds})
+        print(f"Published xgboost version {version} → {version_dir('xgboost', version)}")
     print("Training complete!")